@@ -0,0 +1,195 @@
+import argparse
+import copy
+import json
+import os
+import platform
+import sys
+import timeit
+from typing import Callable, Dict, List
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+)
+
+from board import Board  # noqa: E402
+from game import Game  # noqa: E402
+from opening_table import ROLLS, is_initial_position  # noqa: E402
+from types_ import Cell, Color  # noqa: E402
+
+RESULTS_VERSION = 1
+
+CORPUS: Dict[str, Callable[[], Board]] = {
+    "opening": Board,
+    "midgame": lambda: Board.from_dict({
+        0: Cell(8, Color.LIGHT),
+        3: Cell(2, Color.LIGHT),
+        5: Cell(1, Color.LIGHT),
+        9: Cell(2, Color.DARK),
+        12: Cell(7, Color.DARK),
+        14: Cell(2, Color.LIGHT),
+        16: Cell(2, Color.DARK),
+        17: Cell(1, Color.DARK),
+        19: Cell(2, Color.LIGHT),
+        21: Cell(3, Color.DARK),
+    }),
+    "blocked": lambda: Board.from_dict({
+        0: Cell(10, Color.LIGHT),
+        2: Cell(5, Color.LIGHT),
+        3: Cell(2, Color.DARK),
+        4: Cell(2, Color.DARK),
+        5: Cell(2, Color.DARK),
+        6: Cell(2, Color.DARK),
+        7: Cell(2, Color.DARK),
+        12: Cell(5, Color.DARK),
+    }),
+    "bear-off": lambda: Board.from_dict({
+        6: Cell(3, Color.DARK),
+        8: Cell(4, Color.DARK),
+        10: Cell(5, Color.DARK),
+        18: Cell(4, Color.LIGHT),
+        20: Cell(3, Color.LIGHT),
+        21: Cell(2, Color.LIGHT),
+        23: Cell(6, Color.LIGHT),
+    }),
+}
+
+
+def bench_copy(board: Board):
+    copy.copy(board)
+
+
+def bench_find_movable_pieces(board: Board):
+    for color in Color:
+        for step_len in range(1, 7):
+            board.find_movable_pieces(color, step_len)
+
+
+def bench_move_piece(board: Board):
+    for color in Color:
+        for step_len in range(1, 7):
+            for piece in board.find_movable_pieces(color, step_len)[:1]:
+                board.move_piece(piece, step_len)
+                board.undo_step(piece, step_len)
+
+
+def bench_get_last_piece(board: Board):
+    for color in Color:
+        board.get_last_piece(color)
+
+
+def bench_find_moves(board: Board):
+    game = Game(board)
+
+    # find_moves answers the initial position from the opening table, which
+    # would only time a dict lookup, so the generator is timed directly
+    if is_initial_position(board):
+        for color in Color:
+            for roll in ROLLS:
+                game._search_moves(color, roll, False)
+        return
+
+    for color in Color:
+        for roll in ROLLS:
+            game.find_moves(color, roll)
+
+
+BENCHMARKS: Dict[str, Callable[[Board], None]] = {
+    "Board.__copy__": bench_copy,
+    "Board.find_movable_pieces": bench_find_movable_pieces,
+    "Board.move_piece": bench_move_piece,
+    "Board.get_last_piece": bench_get_last_piece,
+    "Game.find_moves": bench_find_moves,
+}
+
+
+def time_call(func: Callable[[], None], repeat: int, min_time: float) -> float:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run(repeat: int, min_time: float, names: List[str]) -> dict:
+    results = {}
+    for name in names:
+        bench = BENCHMARKS[name]
+        for position_name, make_board in CORPUS.items():
+            board = make_board()
+            seconds = time_call(lambda: bench(board), repeat, min_time)
+            results[f"{name}[{position_name}]"] = seconds * 1e6
+            print(f"{name}[{position_name}]: {seconds * 1e6:.2f} us")
+
+    return {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "unit": "us",
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> bool:
+    assert baseline["version"] == current["version"], "incompatible results"
+
+    has_regressions = False
+    for name, current_time in current["results"].items():
+        baseline_time = baseline["results"].get(name)
+        if baseline_time is None:
+            print(f"{name}: {current_time:.2f} us (new)")
+            continue
+
+        change = (current_time - baseline_time) / baseline_time * 100
+        is_regression = change > threshold
+        has_regressions |= is_regression
+        print(
+            f"{name}: {baseline_time:.2f} -> {current_time:.2f} us "
+            f"({change:+.1f}%){' REGRESSION' if is_regression else ''}"
+        )
+
+    return not has_regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark Board and Game hot paths"
+    )
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument(
+        "--compare", help="baseline JSON file to compare the results against"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="slowdown in percent reported as a regression",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.2,
+        help="minimal time in seconds of a single timing run",
+    )
+    parser.add_argument(
+        "--bench",
+        action="append",
+        choices=list(BENCHMARKS),
+        help="benchmark to run, may be repeated; all are run by default",
+    )
+    args = parser.parse_args()
+
+    results = run(args.repeat, args.min_time, args.bench or list(BENCHMARKS))
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        print()
+        if not compare(baseline, results, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from board import (
+    Board, HOME_ORDER, NUM_CELLS, PIECES, PRIME_LENGTH, cell_order
+)
+from game import Game
+from types_ import Color, Move
+
+_CELLS = np.arange(NUM_CELLS)
+_HEAD_CELL = {Color.LIGHT: 0, Color.DARK: 12}
+_CELL_ORDER = {
+    color: np.array([cell_order(color, cell) for cell in range(NUM_CELLS)])
+    for color in Color
+}
+
+
+@dataclass
+class BatchMoves:
+    moves: List[List[Move]]
+    positions: List[np.ndarray]
+
+
+@dataclass
+class _Level:
+    # positions reached after the level's step, one row per search node
+    positions: np.ndarray
+    owners: np.ndarray
+    head_moved: np.ndarray
+    parents: np.ndarray
+    sources: np.ndarray
+    step_len: int
+    # nodes Game._iter_step_sequences would yield as moves
+    yielded: Optional[np.ndarray] = None
+
+
+def boards_to_array(boards: Sequence[Board]) -> np.ndarray:
+    return np.frombuffer(
+        b"".join(board.position_key() for board in boards), dtype=np.int8
+    ).reshape(len(boards), NUM_CELLS)
+
+
+def array_to_boards(positions: np.ndarray) -> List[Board]:
+    return [
+        Board.from_position_key(row.tobytes())
+        for row in positions.astype(np.int8)
+    ]
+
+
+def movable_mask(
+    positions: np.ndarray, color: Color, step_len: int
+) -> np.ndarray:
+    sign = 1 if color == Color.LIGHT else -1
+    orders = _CELL_ORDER[color]
+    targets = (_CELLS + step_len) % NUM_CELLS
+
+    own = positions * sign > 0
+    mask = (
+        own
+        & (positions[:, targets] * sign >= 0)
+        & (orders + step_len < NUM_CELLS)
+    )
+
+    is_home = own.any(axis=1) & ~(own & (orders < HOME_ORDER)).any(axis=1)
+    last_orders = np.where(own, orders, NUM_CELLS).min(axis=1)
+    bear_off = (orders + step_len == NUM_CELLS) | (
+        (orders + step_len > NUM_CELLS) & (orders == last_orders[:, None])
+    )
+
+    return mask | (own & bear_off & is_home[:, None])
+
+
+def illegal_prime_mask(positions: np.ndarray, color: Color) -> np.ndarray:
+    sign = 1 if color == Color.LIGHT else -1
+    n_windows = NUM_CELLS - PRIME_LENGTH + 1
+
+    # columns ordered along the opposite color's route
+    route = np.argsort(_CELL_ORDER[color.opposite])
+    own = (positions * sign > 0)[:, route]
+    opposite = (positions * sign < 0)[:, route]
+
+    primes = np.ones((len(positions), n_windows), dtype=bool)
+    for offset in range(PRIME_LENGTH):
+        primes &= own[:, offset:offset + n_windows]
+
+    # whether an opposite piece is further along its route than the end
+    # of the prime starting at each window
+    ahead = np.flip(np.logical_or.accumulate(np.flip(opposite, 1), 1), 1)
+    ahead = np.hstack([
+        ahead[:, PRIME_LENGTH:], np.zeros((len(positions), 1), dtype=bool)
+    ])
+
+    return (primes & ~ahead).any(axis=1)
+
+
+def _expand(level: _Level, color: Color, step_len: int) -> _Level:
+    sign = 1 if color == Color.LIGHT else -1
+    head_cell = _HEAD_CELL[color]
+
+    mask = movable_mask(level.positions, color, step_len)
+    mask[:, head_cell] &= ~level.head_moved
+    if step_len == level.step_len:
+        # identical steps are only tried in cell order, as in Game
+        source_orders = _CELL_ORDER[color][level.sources]
+        mask &= _CELL_ORDER[color][None, :] >= source_orders[:, None]
+
+    parents, sources = np.nonzero(mask)
+    positions = level.positions[parents].copy()
+    rows = np.arange(len(parents))
+    positions[rows, sources] -= sign
+
+    stays = _CELL_ORDER[color][sources] + step_len < NUM_CELLS
+    positions[rows[stays], (sources[stays] + step_len) % NUM_CELLS] += sign
+
+    return _Level(
+        positions=positions,
+        owners=level.owners[parents],
+        head_moved=level.head_moved[parents] | (sources == head_cell),
+        parents=parents,
+        sources=sources,
+        step_len=step_len,
+    )
+
+
+def _search(
+    positions: np.ndarray, color: Color, seq: Tuple[int, ...]
+) -> List[_Level]:
+    n_boards = len(positions)
+    levels = [
+        _Level(
+            positions=positions,
+            owners=np.arange(n_boards),
+            head_moved=np.zeros(n_boards, dtype=bool),
+            parents=np.arange(n_boards),
+            sources=np.zeros(n_boards, dtype=np.intp),
+            step_len=0,
+        )
+    ]
+
+    for step_len in seq:
+        level = _expand(levels[-1], color, step_len)
+        if len(level.owners) == 0:
+            break
+        levels.append(level)
+
+    # a node is a move when it is legal and no continuation of it is
+    has_moves_below = np.zeros(len(levels[-1].owners), dtype=bool)
+    for depth in range(len(levels) - 1, -1, -1):
+        level = levels[depth]
+        level.yielded = (
+            ~illegal_prime_mask(level.positions, color) & ~has_moves_below
+        )
+        if depth:
+            parent_has_moves = np.zeros(
+                len(levels[depth - 1].owners), dtype=bool
+            )
+            parent_has_moves[
+                level.parents[level.yielded | has_moves_below]
+            ] = True
+            has_moves_below = parent_has_moves
+
+    return levels
+
+
+def _max_depths(levels: List[_Level], n_boards: int) -> np.ndarray:
+    depths = np.zeros(n_boards, dtype=np.intp)
+    for depth, level in enumerate(levels[1:], start=1):
+        depths[np.unique(level.owners[level.yielded])] = depth
+    return depths
+
+
+def _collect_moves(
+    levels: List[_Level], depths: np.ndarray, color: Color
+) -> Tuple[List[List[Move]], List[List[np.ndarray]]]:
+    n_boards = len(depths)
+    moves: List[List[Move]] = [[] for _ in range(n_boards)]
+    positions: List[List[np.ndarray]] = [[] for _ in range(n_boards)]
+
+    for depth in range(1, len(levels)):
+        level = levels[depth]
+        for node in np.nonzero(
+            level.yielded & (depths[level.owners] == depth)
+        )[0]:
+            move = []
+            index = node
+            for step_level in reversed(levels[1:depth + 1]):
+                move.append((
+                    PIECES[color][step_level.sources[index]],
+                    step_level.step_len,
+                ))
+                index = step_level.parents[index]
+
+            owner = level.owners[node]
+            moves[owner].append(tuple(reversed(move)))
+            positions[owner].append(level.positions[node])
+
+    return moves, positions
+
+
+def find_moves_batch(
+    positions: np.ndarray,
+    color: Color,
+    dice: Tuple[int, int],
+    unique: bool = False,
+) -> BatchMoves:
+    positions = np.asarray(positions, dtype=np.int8)
+    n_boards = len(positions)
+    dice = tuple(sorted(dice, reverse=True))
+
+    searches = [
+        _search(positions, color, seq) for seq in Game._step_sequences(dice)
+    ]
+    depths = np.maximum.reduce(
+        [_max_depths(levels, n_boards) for levels in searches]
+    )
+
+    moves: List[List[Move]] = [[] for _ in range(n_boards)]
+    successors: List[List[np.ndarray]] = [[] for _ in range(n_boards)]
+    for levels in searches:
+        search_moves, search_successors = _collect_moves(levels, depths, color)
+        for board_num in range(n_boards):
+            moves[board_num].extend(search_moves[board_num])
+            successors[board_num].extend(search_successors[board_num])
+
+    if unique:
+        for board_num in range(n_boards):
+            seen = {}
+            for move, successor in zip(moves[board_num], successors[board_num]):
+                seen.setdefault(successor.tobytes(), (move, successor))
+            moves[board_num] = [move for move, _ in seen.values()]
+            successors[board_num] = [successor for _, successor in seen.values()]
+
+    return BatchMoves(
+        moves=moves,
+        positions=[
+            np.array(board_successors, dtype=np.int8).reshape(-1, NUM_CELLS)
+            for board_successors in successors
+        ],
+    )
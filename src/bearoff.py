@@ -0,0 +1,254 @@
+import argparse
+import struct
+import sys
+from array import array
+from itertools import accumulate
+from math import comb
+from typing import Iterator, List, Optional, Tuple
+
+from board import (
+    HOME_ORDER, NUM_CELLS, PIECES_ON_BOARD, TOTAL_PIECES, Board
+)
+from opening_table import ROLLS
+from search import Evaluator, race_evaluator
+from types_ import Color
+
+HOME_POINTS = NUM_CELLS - HOME_ORDER
+
+BEAROFF_MAGIC = b"NRBO"
+BEAROFF_VERSION = 1
+
+# magic, version, maximum number of pieces and number of positions
+HEADER_STRUCT = struct.Struct("<4sHHI")
+
+# pieces on every home point, the point one pip from bearing off first
+HomeCounts = Tuple[int, ...]
+
+# _INDEX_TERMS[point][ones_position] = comb(ones_position, point + 1)
+_INDEX_TERMS = [
+    [
+        comb(position, point + 1)
+        for position in range(TOTAL_PIECES + HOME_POINTS)
+    ]
+    for point in range(HOME_POINTS)
+]
+
+
+class BearoffError(Exception):
+    pass
+
+
+def n_positions(max_pieces: int) -> int:
+    return comb(max_pieces + HOME_POINTS, HOME_POINTS)
+
+
+def position_index(counts: HomeCounts) -> int:
+    # a distribution is a string of zeros (pieces) and ones (ends of points),
+    # ranked in colex order of the positions of the ones; a distribution of
+    # n pieces ranks below every distribution with more pieces, so tables of
+    # different sizes share their indices
+    index = 0
+    for point, total in enumerate(accumulate(counts)):
+        index += _INDEX_TERMS[point][total + point]
+    return index
+
+
+def iter_positions(
+    max_pieces: int, points: int = HOME_POINTS
+) -> Iterator[HomeCounts]:
+    if points == 0:
+        yield ()
+        return
+
+    for n_pieces in range(max_pieces + 1):
+        for rest in iter_positions(max_pieces - n_pieces, points - 1):
+            yield (n_pieces,) + rest
+
+
+def iter_steps(counts: HomeCounts, step_len: int) -> Iterator[HomeCounts]:
+    # positions after one step; a piece is born off with an exact step or
+    # with a longer one from the rearmost point
+    rearmost = max(
+        (point for point, n_pieces in enumerate(counts) if n_pieces), default=-1
+    )
+
+    for point, n_pieces in enumerate(counts):
+        if not n_pieces:
+            continue
+
+        target = point - step_len
+        if target < -1 and point != rearmost:
+            continue
+
+        next_counts = list(counts)
+        next_counts[point] -= 1
+        if target >= 0:
+            next_counts[target] += 1
+        yield tuple(next_counts)
+
+
+def generate_bearoff_table(max_pieces: int = TOTAL_PIECES) -> array:
+    """
+    Expected number of rolls to bear off every distribution of up to
+    max_pieces pieces, indexed by position_index. Positions are solved in
+    order of their pip count, since every step leads to fewer pips.
+    """
+    size = n_positions(max_pieces)
+    expected_rolls = array("d", [0.0]) * size
+
+    # best[n_steps][step_len][index] is the lowest expected number of rolls
+    # reachable with n_steps steps of step_len, the ends of doubles
+    best = [
+        [array("d", [0.0]) * size for _ in range(7)] for _ in range(4)
+    ]
+
+    positions = sorted(
+        iter_positions(max_pieces),
+        key=lambda counts: sum(
+            n_pieces * (point + 1) for point, n_pieces in enumerate(counts)
+        ),
+    )
+
+    for counts in positions:
+        index = position_index(counts)
+        if not any(counts):
+            continue
+
+        successors = [[]] + [
+            [position_index(step) for step in iter_steps(counts, step_len)]
+            for step_len in range(1, 7)
+        ]
+
+        total = 0.0
+        for roll in ROLLS:
+            first, second = roll
+            if first == second:
+                value = min(best[3][first][step] for step in successors[first])
+                probability = 1 / 36
+            else:
+                value = min(
+                    min(best[1][second][step] for step in successors[first]),
+                    min(best[1][first][step] for step in successors[second]),
+                )
+                probability = 2 / 36
+            total += probability * value
+
+        expected_rolls[index] = 1 + total
+        for step_len in range(1, 7):
+            best[0][step_len][index] = expected_rolls[index]
+            for n_steps in range(1, 4):
+                best[n_steps][step_len][index] = min(
+                    best[n_steps - 1][step_len][step]
+                    for step in successors[step_len]
+                )
+
+    return array("f", expected_rolls)
+
+
+class BearoffDatabase:
+    """
+    One-sided bear-off database: the expected number of rolls to bear off
+    every home board distribution, with O(1) lookups by position_index.
+    """
+
+    def __init__(self, max_pieces: int, expected_rolls: array):
+        if len(expected_rolls) != n_positions(max_pieces):
+            raise BearoffError("table size does not match the piece count")
+        self.max_pieces = max_pieces
+        self._expected_rolls = expected_rolls
+
+    @classmethod
+    def generate(cls, max_pieces: int = TOTAL_PIECES) -> "BearoffDatabase":
+        return cls(max_pieces, generate_bearoff_table(max_pieces))
+
+    def __len__(self) -> int:
+        return len(self._expected_rolls)
+
+    def save(self, path: str):
+        expected_rolls = array("f", self._expected_rolls)
+        if sys.byteorder != "little":
+            expected_rolls.byteswap()
+
+        with open(path, "wb") as table_file:
+            table_file.write(HEADER_STRUCT.pack(
+                BEAROFF_MAGIC, BEAROFF_VERSION, self.max_pieces, len(self)
+            ))
+            expected_rolls.tofile(table_file)
+
+    @classmethod
+    def load(cls, path: str) -> "BearoffDatabase":
+        with open(path, "rb") as table_file:
+            data = table_file.read()
+
+        if len(data) < HEADER_STRUCT.size:
+            raise BearoffError("truncated bear-off database")
+        magic, version, max_pieces, size = HEADER_STRUCT.unpack_from(data)
+        if magic != BEAROFF_MAGIC:
+            raise BearoffError("not a bear-off database")
+        if version != BEAROFF_VERSION:
+            raise BearoffError(
+                f"unsupported bear-off database version {version}"
+            )
+
+        expected_rolls = array("f")
+        expected_rolls.frombytes(data[HEADER_STRUCT.size:])
+        if sys.byteorder != "little":
+            expected_rolls.byteswap()
+        if len(expected_rolls) != size:
+            raise BearoffError("truncated bear-off database")
+
+        return cls(max_pieces, expected_rolls)
+
+    def expected_rolls(self, counts: HomeCounts) -> float:
+        if sum(counts) > self.max_pieces:
+            raise BearoffError(
+                f"{sum(counts)} pieces exceed the database limit of "
+                f"{self.max_pieces}"
+            )
+        return self._expected_rolls[position_index(counts)]
+
+    def covers(self, board: Board, color: Color) -> bool:
+        return (
+            board.is_home(color)
+            and board.features(color)[PIECES_ON_BOARD] <= self.max_pieces
+        )
+
+    def board_expected_rolls(self, board: Board, color: Color) -> float:
+        if not board.is_home(color):
+            raise BearoffError(f"{color.name} pieces are not all home")
+        return self.expected_rolls(board.home_counts(color))
+
+
+def bearoff_evaluator(
+    database: BearoffDatabase, fallback: Evaluator = race_evaluator
+) -> Evaluator:
+    # race_evaluator with exact expected rolls in place of pip counts once
+    # both sides are in the database
+    def evaluate(board: Board, color: Color) -> float:
+        opposite = color.opposite
+        if not (database.covers(board, color)
+                and database.covers(board, opposite)):
+            return fallback(board, color)
+
+        own_rolls = database.board_expected_rolls(board, color)
+        opposite_rolls = database.board_expected_rolls(board, opposite)
+        return (opposite_rolls - own_rolls) / (own_rolls + opposite_rolls + 1)
+
+    return evaluate
+
+
+def main(args: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Generate the one-sided bear-off database"
+    )
+    parser.add_argument("output")
+    parser.add_argument("--max-pieces", type=int, default=TOTAL_PIECES)
+    parsed = parser.parse_args(args)
+
+    database = BearoffDatabase.generate(parsed.max_pieces)
+    database.save(parsed.output)
+    print(f"{len(database)} positions written to {parsed.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
-import copy
-from typing import Optional, List, Dict, Iterable
+import random
+from array import array
+from typing import Optional, List, Dict, Iterable, Iterator, Tuple
 
 from types_ import Color, Cell, Piece
 
@@ -7,6 +8,59 @@ TOTAL_PIECES = 15
 NUM_CELLS = 24
 
 
+_zobrist_random = random.Random(NUM_CELLS)
+
+# indexed by cell position and then by packed cell value shifted by
+# TOTAL_PIECES; empty cells hash to 0 so they can be skipped
+ZOBRIST_CELL_KEYS = [
+    [
+        _zobrist_random.getrandbits(64) if value != 0 else 0
+        for value in range(-TOTAL_PIECES, TOTAL_PIECES + 1)
+    ]
+    for _ in range(NUM_CELLS)
+]
+
+
+FULL_MASK = (1 << NUM_CELLS) - 1
+
+# pieces and cells are immutable, so every possible one is made once and
+# shared instead of being allocated by every query
+PIECES = {
+    color: tuple(
+        Piece(color=color, position=position) for position in range(NUM_CELLS)
+    )
+    for color in Color
+}
+
+# route order of the first cell of a color's home
+HOME_ORDER = 18
+
+# number of consecutive blocked points that makes a prime
+PRIME_LENGTH = 6
+
+
+def iter_mask(mask: int) -> Iterator[int]:
+    while mask:
+        lowest_bit = mask & -mask
+        yield lowest_bit.bit_length() - 1
+        mask ^= lowest_bit
+
+
+def iter_runs(mask: int) -> Iterator[Tuple[int, int]]:
+    # (first bit, length) of every run of consecutive set bits
+    while mask:
+        first = (mask & -mask).bit_length() - 1
+        shifted = mask >> first
+        length = (~shifted & (shifted + 1)).bit_length() - 1
+        yield first, length
+        mask &= ~(((1 << length) - 1) << first)
+
+
+def to_dark_order(mask: int) -> int:
+    # rotates a cell mask so that bit i stands for DARK route order i
+    return ((mask >> 12) | (mask << 12)) & FULL_MASK
+
+
 def light_cell_order(value: int) -> int:
     return value
 
@@ -15,99 +69,465 @@ def dark_cell_order(value: int) -> int:
     return (value - 12) % 24
 
 
+def cell_order(color: Color, value: int) -> int:
+    if color == Color.LIGHT:
+        return light_cell_order(value)
+    else:
+        return dark_cell_order(value)
+
+
+# pieces never pass the end of their route, so a step of length n is only
+# possible from cells that are at least n cells away from it
+ROUTE_MASKS = {
+    color: [
+        sum(
+            1 << cell
+            for cell in range(NUM_CELLS)
+            if cell_order(color, cell) + move_length < NUM_CELLS
+        )
+        for move_length in range(7)
+    ]
+    for color in Color
+}
+
+
+# a piece is born off with an exact step from the cell that is that step
+# away from the end of its route
+BEAR_OFF_MASKS = {
+    color: [
+        sum(
+            1 << cell
+            for cell in range(NUM_CELLS)
+            if cell_order(color, cell) + move_length == NUM_CELLS
+        )
+        for move_length in range(7)
+    ]
+    for color in Color
+}
+
+
+def order_position(color: Color, order: int) -> int:
+    if color == Color.LIGHT:
+        return order
+    else:
+        return (order + 12) % NUM_CELLS
+
+
+# pips a piece on a cell still has to travel to be born off
+PIP_DISTANCES = {
+    color: [NUM_CELLS - cell_order(color, cell) for cell in range(NUM_CELLS)]
+    for color in Color
+}
+IS_HOME_CELL = {
+    color: [cell_order(color, cell) >= HOME_ORDER for cell in range(NUM_CELLS)]
+    for color in Color
+}
+
+# per-color features kept up to date by Board, see Board.features
+PIP_COUNT = 0
+PIECES_ON_BOARD = 1
+PIECES_HOME = 2
+BLOTS = 3
+POINTS = 4
+NUM_FEATURES = 5
+
+
+def feature_offset(color: Color) -> int:
+    return 0 if color == Color.LIGHT else NUM_FEATURES
+
+
+# feature offset and per-cell tables indexed by whether a cell holds LIGHT
+# pieces, for the hot path of Board._add_to_cell
+_CELL_FEATURE_TABLES = {
+    is_light: (feature_offset(color), PIP_DISTANCES[color], IS_HOME_CELL[color])
+    for is_light, color in ((True, Color.LIGHT), (False, Color.DARK))
+}
+
+
+def color_sign(color: Color) -> int:
+    return 1 if color == Color.LIGHT else -1
+
+
+def value_color(value: int) -> Optional[Color]:
+    if value > 0:
+        return Color.LIGHT
+    elif value < 0:
+        return Color.DARK
+    else:
+        return None
+
+
+# indexed by packed cell value shifted by TOTAL_PIECES
+CELLS = tuple(
+    Cell(n_pieces=abs(value), color=value_color(value))
+    for value in range(-TOTAL_PIECES, TOTAL_PIECES + 1)
+)
+
+
+def cell_value(cell: Cell) -> int:
+    if cell.n_pieces == 0:
+        return 0
+    return color_sign(cell.color) * cell.n_pieces
+
+
 class Board:
+    """
+    Cells are packed into a single signed byte array: the absolute value
+    of a cell is the number of pieces on it, positive values are LIGHT
+    pieces and negative values are DARK ones.
+    """
+
     def __init__(self, cells: Optional[List[Cell]] = None):
         if cells:
-            self._cells = cells
+            self._cells = array("b", (cell_value(cell) for cell in cells))
         else:
-            self._cells = [Cell() for _ in range(24)]
+            self._cells = array("b", bytes(NUM_CELLS))
+            self._cells[0] = TOTAL_PIECES
+            self._cells[12] = -TOTAL_PIECES
+
+        self._index_cells()
 
-            light_start_cell = self._cells[0]
-            light_start_cell.color = Color.LIGHT
-            light_start_cell.n_pieces = TOTAL_PIECES
+    def _index_cells(self):
+        values = self._cells
+        self._cells = array("b", bytes(NUM_CELLS))
+        self._key = 0
+        # bit i of a color mask is set when the color occupies cell i
+        self._light_mask = 0
+        self._dark_mask = 0
+        self._features = array("h", bytes(2 * 2 * NUM_FEATURES))
+        # number of maximal blocks of each length per color
+        self._block_runs = array("b", bytes(2 * (NUM_CELLS + 1)))
 
-            dark_start_cell = self._cells[12]
-            dark_start_cell.color = Color.DARK
-            dark_start_cell.n_pieces = TOTAL_PIECES
+        for position, value in enumerate(values):
+            if value != 0:
+                self._add_to_cell(position, value)
 
     @classmethod
     def from_dict(cls, board_state: Dict[int, Cell]) -> "Board":
         return cls(cells=[board_state.get(i, Cell()) for i in range(24)])
 
+    @classmethod
+    def from_position_key(cls, position_key: bytes) -> "Board":
+        if len(position_key) != NUM_CELLS:
+            raise ValueError(
+                f"position key of {len(position_key)} bytes, "
+                f"expected {NUM_CELLS}"
+            )
+
+        cells = array("b", position_key)
+        if any(abs(value) > TOTAL_PIECES for value in cells):
+            raise ValueError("more than 15 pieces on a cell")
+        if (
+            sum(value for value in cells if value > 0) > TOTAL_PIECES
+            or -sum(value for value in cells if value < 0) > TOTAL_PIECES
+        ):
+            raise ValueError("more than 15 pieces of a color")
+
+        board = cls.__new__(cls)
+        board._cells = cells
+        board._index_cells()
+        return board
+
+    def to_bytes(self) -> bytes:
+        return self._cells.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Board":
+        return cls.from_position_key(bytes(data))
+
+    @property
+    def zobrist_key(self) -> int:
+        return self._key
+
+    def __hash__(self):
+        return self._key
+
+    def __eq__(self, other):
+        if not isinstance(other, Board):
+            return NotImplemented
+        return self._cells == other._cells
+
     def get_piece(self, position: int) -> Optional[Piece]:
         assert 0 <= position <= 23, "unexpected position"
 
-        cell = self._cells[position]
+        color = value_color(self._cells[position])
 
-        if cell.n_pieces == 0:
+        if color is None:
             return None
         else:
-            return Piece(color=cell.color, position=position)
+            return PIECES[color][position]
+
+    def get_cell(self, position: int) -> Cell:
+        value = self._cells[position]
+        return CELLS[value + TOTAL_PIECES]
+
+    def position_key(self) -> bytes:
+        return self._cells.tobytes()
+
+    def occupancy_mask(self, color: Color) -> int:
+        if color == Color.LIGHT:
+            return self._light_mask
+        else:
+            return self._dark_mask
 
     def __copy__(self):
-        return Board([copy.copy(cell) for cell in self._cells])
+        board = Board.__new__(Board)
+        board._cells = self._cells[:]
+        board._key = self._key
+        board._light_mask = self._light_mask
+        board._dark_mask = self._dark_mask
+        board._features = self._features[:]
+        board._block_runs = self._block_runs[:]
+        return board
+
+    def _route_mask(self, color: Color) -> int:
+        # occupancy mask with bit i standing for route order i
+        if color == Color.LIGHT:
+            return self._light_mask
+        else:
+            return to_dark_order(self._dark_mask)
+
+    def _block_mask(self, color: Color) -> int:
+        # occupancy mask of the color with bit i standing for route order i
+        # of the opposite color, the route the color's blocks stand on
+        if color == Color.LIGHT:
+            return to_dark_order(self._light_mask)
+        else:
+            return self._dark_mask
+
+    def _update_block_runs(self, is_light: bool, position: int, delta: int):
+        if is_light:
+            mask = self._block_mask(Color.LIGHT)
+            index = dark_cell_order(position)
+            offset = 0
+        else:
+            mask = self._dark_mask
+            index = position
+            offset = NUM_CELLS + 1
+
+        # lengths of the blocks right behind and right ahead of the cell,
+        # which the cell joins or separates
+        below = ~mask & ((1 << index) - 1)
+        behind_len = index - below.bit_length()
+        above = mask >> (index + 1)
+        ahead_len = (~above & (above + 1)).bit_length() - 1
+
+        block_runs = self._block_runs
+        if behind_len:
+            block_runs[offset + behind_len] -= delta
+        if ahead_len:
+            block_runs[offset + ahead_len] -= delta
+        block_runs[offset + behind_len + ahead_len + 1] += delta
+
+    def longest_block(self, color: Color) -> int:
+        offset = 0 if color == Color.LIGHT else NUM_CELLS + 1
+        for length in range(NUM_CELLS, 0, -1):
+            if self._block_runs[offset + length]:
+                return length
+        return 0
+
+    def blocks(self, color: Color) -> List[Tuple[int, int]]:
+        return [
+            (order_position(color.opposite, first_order), length)
+            for first_order, length in iter_runs(self._block_mask(color))
+        ]
+
+    def has_illegal_prime(self, color: Color) -> bool:
+        offset = 0 if color == Color.LIGHT else NUM_CELLS + 1
+        if not any(
+            self._block_runs[offset + PRIME_LENGTH:offset + NUM_CELLS + 1]
+        ):
+            return False
+
+        # a prime is only allowed with an opposite piece ahead of it
+        opposite_mask = self._route_mask(color.opposite)
+        return any(
+            length >= PRIME_LENGTH
+            and opposite_mask >> (first_order + length) == 0
+            for first_order, length in iter_runs(self._block_mask(color))
+        )
+
+    def _last_order(self, color: Color) -> int:
+        route_mask = self._route_mask(color)
+        return (route_mask & -route_mask).bit_length() - 1
+
+    def features(self, color: Color) -> Tuple[int, ...]:
+        offset = feature_offset(color)
+        return tuple(self._features[offset:offset + NUM_FEATURES])
+
+    def pip_count(self, color: Color) -> int:
+        return self._features[feature_offset(color) + PIP_COUNT]
+
+    def is_home(self, color: Color) -> bool:
+        offset = feature_offset(color)
+        pieces_on_board = self._features[offset + PIECES_ON_BOARD]
+        return (
+            pieces_on_board != 0
+            and self._features[offset + PIECES_HOME] == pieces_on_board
+        )
+
+    def home_counts(self, color: Color) -> Tuple[int, ...]:
+        # pieces on every home point, the point one pip from the end of the
+        # route first
+        sign = color_sign(color)
+        return tuple(
+            max(sign * self._cells[order_position(color, NUM_CELLS - pips)], 0)
+            for pips in range(1, NUM_CELLS - HOME_ORDER + 1)
+        )
+
+    @staticmethod
+    def is_bear_off(piece: Piece, move_length: int) -> bool:
+        return cell_order(piece.color, piece.position) + move_length >= NUM_CELLS
 
     def can_move_piece(self, piece: Piece, move_length: int) -> bool:
         assert move_length != 0, "0-cell moves are prohibited"
         assert \
-            self._cells[piece.position].n_pieces != 0, \
+            self._cells[piece.position] != 0, \
             "provided piece doesn't exist"
 
-        start_cell = self._cells[piece.position]
+        start_value = self._cells[piece.position]
         target_cell_num = (piece.position + move_length) % NUM_CELLS
 
-        if (
-            start_cell.color == Color.LIGHT
-            and target_cell_num <= piece.position
-        ):
-            return False
+        if self.is_bear_off(piece, move_length):
+            return bool(
+                self.movable_mask(piece.color, move_length)
+                & (1 << piece.position)
+            )
 
-        target_cell = self._cells[target_cell_num]
-        return target_cell.color != start_cell.color.opposite
+        return start_value * self._cells[target_cell_num] >= 0
 
     def get_pieces(self, color: Color) -> Iterable[Piece]:
+        pieces = PIECES[color]
         return (
-            Piece(color=color, position=i)
-            for i, cell in enumerate(self._cells)
-            if cell.n_pieces != 0 and cell.color == color
+            pieces[position] for position in iter_mask(self.occupancy_mask(color))
         )
 
+    def movable_mask(self, color: Color, move_length: int) -> int:
+        if color == Color.LIGHT:
+            own_mask, opposite_mask = self._light_mask, self._dark_mask
+        else:
+            own_mask, opposite_mask = self._dark_mask, self._light_mask
+
+        # bit i of the rotated mask is set when the opposite color
+        # occupies cell i + move_length
+        blocked_mask = (
+            (opposite_mask >> move_length)
+            | (opposite_mask << (NUM_CELLS - move_length))
+        ) & FULL_MASK
+
+        movable_mask = own_mask & ~blocked_mask & ROUTE_MASKS[color][move_length]
+
+        if self.is_home(color):
+            movable_mask |= own_mask & BEAR_OFF_MASKS[color][move_length]
+
+            # a step longer than needed may bear off the rearmost piece
+            last_order = self._last_order(color)
+            if last_order + move_length > NUM_CELLS:
+                movable_mask |= 1 << order_position(color, last_order)
+
+        return movable_mask
+
     def find_movable_pieces(self, color: Color, move_length: int) -> Iterable[Piece]:
+        pieces = PIECES[color]
         return [
-            piece
-            for piece in self.get_pieces(color)
-            if self.can_move_piece(piece, move_length)
+            pieces[position]
+            for position in iter_mask(self.movable_mask(color, move_length))
         ]
 
     def move_piece(self, piece: Piece, move_length: int):
         assert 0 < move_length <= 6, "Invalid move length"
 
-        start_cell = self._cells[piece.position]
-        assert start_cell.n_pieces != 0, "Attempt to move from empty cell"
+        start_value = self._cells[piece.position]
+        assert start_value != 0, "Attempt to move from empty cell"
 
-        end_cell = self._cells[piece.position + move_length]
-        assert \
-            end_cell.color != start_cell.color.opposite, \
-            "Attempt to step to opposite color"
+        if self.is_bear_off(piece, move_length):
+            assert \
+                self.can_move_piece(piece, move_length), \
+                "Attempt to bear off before all pieces are home"
+        else:
+            end_position = (piece.position + move_length) % NUM_CELLS
+            assert \
+                start_value * self._cells[end_position] >= 0, \
+                "Attempt to step to opposite color"
 
-        move_color = start_cell.color
+        self.apply_step(piece, move_length)
 
-        start_cell.n_pieces -= 1
-        if start_cell.n_pieces == 0:
-            start_cell.color = None
+    def _add_to_cell(self, position: int, delta: int):
+        old_value = self._cells[position]
+        new_value = old_value + delta
+        self._cells[position] = new_value
 
-        end_cell.n_pieces += 1
-        end_cell.color = move_color
+        if new_value == 0:
+            self._light_mask &= ~(1 << position)
+            self._dark_mask &= ~(1 << position)
+        elif old_value == 0:
+            if new_value > 0:
+                self._light_mask |= 1 << position
+            else:
+                self._dark_mask |= 1 << position
 
-    def get_last_piece(self, color: Color) -> Optional[Piece]:
-        key = light_cell_order if color == Color.LIGHT else dark_cell_order
+        if old_value == 0 or new_value == 0:
+            self._update_block_runs(
+                old_value + new_value > 0, position, 1 if new_value else -1
+            )
 
-        appropriate_cells = [
-            i for i, cell in enumerate(self._cells) if cell.color == color
+        position_keys = ZOBRIST_CELL_KEYS[position]
+        self._key ^= (
+            position_keys[old_value + TOTAL_PIECES]
+            ^ position_keys[new_value + TOTAL_PIECES]
+        )
+
+        old_count, new_count = abs(old_value), abs(new_value)
+        count_delta = new_count - old_count
+        offset, pip_distances, is_home_cell = _CELL_FEATURE_TABLES[
+            old_value + new_value > 0
         ]
 
-        if len(appropriate_cells) == 0:
+        features = self._features
+        features[offset + PIP_COUNT] += count_delta * pip_distances[position]
+        features[offset + PIECES_ON_BOARD] += count_delta
+        if is_home_cell[position]:
+            features[offset + PIECES_HOME] += count_delta
+        if old_count == 1 or new_count == 1:
+            features[offset + BLOTS] += (new_count == 1) - (old_count == 1)
+        if old_count == 0 or new_count == 0:
+            features[offset + POINTS] += (new_count != 0) - (old_count != 0)
+
+    def apply_step(self, piece: Piece, move_length: int):
+        sign = color_sign(piece.color)
+        self._add_to_cell(piece.position, -sign)
+        if cell_order(piece.color, piece.position) + move_length < NUM_CELLS:
+            self._add_to_cell((piece.position + move_length) % NUM_CELLS, sign)
+
+    def undo_step(self, piece: Piece, move_length: int):
+        sign = color_sign(piece.color)
+        if cell_order(piece.color, piece.position) + move_length < NUM_CELLS:
+            self._add_to_cell((piece.position + move_length) % NUM_CELLS, -sign)
+        self._add_to_cell(piece.position, sign)
+
+    def get_last_piece(self, color: Color) -> Optional[Piece]:
+        if self.occupancy_mask(color) == 0:
             return None
 
-        last_position = min(appropriate_cells, key=key)
-        return Piece(color=color, position=last_position)
\ No newline at end of file
+        return PIECES[color][order_position(color, self._last_order(color))]
+
+    def is_non_contact(self) -> bool:
+        # neither color has an opposite piece ahead of its rearmost piece, so
+        # no step of either color can be blocked any more
+        if self._light_mask == 0 or self._dark_mask == 0:
+            return False
+
+        return (
+            self._dark_mask >> self._last_order(Color.LIGHT) == 0
+            and to_dark_order(self._light_mask) >> self._last_order(Color.DARK)
+            == 0
+        )
+
+    def route_counts(self, color: Color) -> List[int]:
+        # pieces of the color on every cell, in route order
+        sign = color_sign(color)
+        cells = self._cells
+        return [
+            max(sign * cells[order_position(color, order)], 0)
+            for order in range(NUM_CELLS)
+        ]
@@ -0,0 +1,175 @@
+import mmap
+import os
+import struct
+from typing import BinaryIO, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+from board import NUM_CELLS
+from encoding import POSITION_SIZE
+from game import Game
+from types_ import Color
+
+DATASET_MAGIC = b"NRDS"
+DATASET_VERSION = 1
+
+# magic, version, record size and number of records
+HEADER_STRUCT = struct.Struct("<4sHHQ")
+VALUE_STRUCT = struct.Struct("<f")
+
+RECORD_DTYPE = np.dtype([
+    ("cells", np.int8, (NUM_CELLS,)),
+    ("light_born_off", np.uint8),
+    ("dark_born_off", np.uint8),
+    ("to_move", np.uint8),
+    ("value", "<f4"),
+])
+RECORD_SIZE = POSITION_SIZE + VALUE_STRUCT.size
+
+assert RECORD_DTYPE.itemsize == RECORD_SIZE, "record layout mismatch"
+
+Record = Tuple[Game, Color, float]
+
+
+class DatasetError(Exception):
+    pass
+
+
+def _read_header(dataset_file: BinaryIO) -> int:
+    # closes the file when it isn't a complete dataset
+    try:
+        header = dataset_file.read(HEADER_STRUCT.size)
+        if len(header) != HEADER_STRUCT.size:
+            raise DatasetError("truncated dataset header")
+        magic, version, record_size, n_records = HEADER_STRUCT.unpack(header)
+
+        if magic != DATASET_MAGIC:
+            raise DatasetError("not a position dataset")
+        if version != DATASET_VERSION or record_size != RECORD_SIZE:
+            raise DatasetError(f"unsupported dataset version {version}")
+
+        file_size = os.fstat(dataset_file.fileno()).st_size
+        if file_size < HEADER_STRUCT.size + n_records * RECORD_SIZE:
+            raise DatasetError(
+                f"dataset is shorter than its {n_records} records"
+            )
+    except DatasetError:
+        dataset_file.close()
+        raise
+
+    return n_records
+
+
+class DatasetWriter:
+    def __init__(self, path: str):
+        if os.path.exists(path):
+            self._file = open(path, "r+b")
+            self._n_records = _read_header(self._file)
+        else:
+            self._file = open(path, "w+b")
+            self._n_records = 0
+            self._write_header()
+
+    def __enter__(self) -> "DatasetWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._n_records
+
+    def _write_header(self):
+        self._file.seek(0)
+        self._file.write(HEADER_STRUCT.pack(
+            DATASET_MAGIC, DATASET_VERSION, RECORD_SIZE, self._n_records
+        ))
+
+    def append(self, records: Iterable[Record]):
+        data = b"".join(
+            game.to_bytes(to_move) + VALUE_STRUCT.pack(value)
+            for game, to_move, value in records
+        )
+
+        self._file.seek(HEADER_STRUCT.size + self._n_records * RECORD_SIZE)
+        self._file.write(data)
+        self._n_records += len(data) // RECORD_SIZE
+        # the header is written last, so an interrupted batch is ignored
+        self._write_header()
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class DatasetReader:
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        n_records = _read_header(self._file)
+
+        self._mmap: Optional[mmap.mmap] = None
+        if n_records:
+            self._mmap = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+            self.records = np.frombuffer(
+                self._mmap,
+                dtype=RECORD_DTYPE,
+                count=n_records,
+                offset=HEADER_STRUCT.size,
+            )
+        else:
+            self.records = np.empty(0, dtype=RECORD_DTYPE)
+
+    def __enter__(self) -> "DatasetReader":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def cells(self) -> np.ndarray:
+        return self.records["cells"]
+
+    @property
+    def values(self) -> np.ndarray:
+        return self.records["value"]
+
+    def get(self, index: int) -> Record:
+        record = self.records[index]
+        game, to_move = Game.from_bytes(
+            record.tobytes()[:POSITION_SIZE]
+        )
+        return game, to_move, float(record["value"])
+
+    def batch(self, indices: np.ndarray) -> np.ndarray:
+        return self.records[indices]
+
+    def iter_batches(
+        self,
+        batch_size: int,
+        shuffle: bool = False,
+        seed: Optional[int] = None,
+    ) -> Iterator[np.ndarray]:
+        if not shuffle:
+            for start in range(0, len(self), batch_size):
+                yield self.records[start:start + batch_size]
+            return
+
+        order = np.random.default_rng(seed).permutation(len(self))
+        for start in range(0, len(self), batch_size):
+            yield self.records[np.sort(order[start:start + batch_size])]
+
+    def close(self):
+        self.records = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # batches handed out earlier still view the map, it is
+                # unmapped once the last of them is released
+                pass
+        self._file.close()
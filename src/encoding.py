@@ -0,0 +1,59 @@
+from typing import Iterable, List, Tuple
+
+from board import NUM_CELLS, PIECES
+from game import GAME_STRUCT, Game
+from types_ import Color, Move
+
+MAX_MOVE_STEPS = 4
+NO_STEP = 0xFF
+
+POSITION_SIZE = GAME_STRUCT.size
+MOVE_SIZE = MAX_MOVE_STEPS
+
+
+def encode_move(move: Move) -> bytes:
+    assert len(move) <= MAX_MOVE_STEPS, "too many steps in a move"
+
+    # a step fits a byte as position * 6 + step length - 1 < 144
+    steps = [piece.position * 6 + step_len - 1 for piece, step_len in move]
+    return bytes(steps + [NO_STEP] * (MAX_MOVE_STEPS - len(steps)))
+
+
+def decode_move(data: bytes, color: Color) -> Move:
+    if any(step >= NUM_CELLS * 6 and step != NO_STEP for step in data):
+        raise ValueError(f"invalid move data {bytes(data).hex()}")
+
+    return tuple(
+        (PIECES[color][step // 6], step % 6 + 1)
+        for step in data
+        if step != NO_STEP
+    )
+
+
+def encode_positions(positions: Iterable[Tuple[Game, Color]]) -> bytes:
+    return b"".join(game.to_bytes(to_move) for game, to_move in positions)
+
+
+def decode_positions(data: bytes) -> List[Tuple[Game, Color]]:
+    if len(data) % POSITION_SIZE:
+        raise ValueError("truncated position data")
+
+    view = memoryview(data)
+    return [
+        Game.from_bytes(view[start:start + POSITION_SIZE])
+        for start in range(0, len(data), POSITION_SIZE)
+    ]
+
+
+def encode_moves(moves: Iterable[Move]) -> bytes:
+    return b"".join(encode_move(move) for move in moves)
+
+
+def decode_moves(data: bytes, color: Color) -> List[Move]:
+    if len(data) % MOVE_SIZE:
+        raise ValueError("truncated move data")
+
+    return [
+        decode_move(data[start:start + MOVE_SIZE], color)
+        for start in range(0, len(data), MOVE_SIZE)
+    ]
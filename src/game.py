@@ -1,15 +1,122 @@
-import copy
-from typing import Tuple, List, Iterable
+import random
+import struct
+from contextlib import closing
+from functools import partial
+from typing import (
+    Tuple, List, Iterator, Dict, Hashable, Optional, Sequence
+)
 
-from board import Board
+from board import (
+    Board, HOME_ORDER, NUM_CELLS, PIECES, PIECES_ON_BOARD, TOTAL_PIECES,
+    cell_order,
+)
+from move_cache import MoveCache
+from opening_table import get_opening_moves, is_initial_position
 from types_ import Color, Move, Piece
 
+_zobrist_random = random.Random(len(Color))
+
+ZOBRIST_TO_MOVE_KEYS = {
+    color: _zobrist_random.getrandbits(64) for color in Color
+}
+ZOBRIST_BORN_OFF_KEYS = {
+    color: [_zobrist_random.getrandbits(64) for _ in range(TOTAL_PIECES + 1)]
+    for color in Color
+}
+
+
+# route orders of the cells in cell order, the order in which
+# Board.find_movable_pieces lists pieces
+CELL_ROUTE_ORDERS = {
+    color: [cell_order(color, cell) for cell in range(NUM_CELLS)]
+    for color in Color
+}
+
+
+# board cells, LIGHT and DARK born-off counters and the color to move
+GAME_STRUCT = struct.Struct(f"{NUM_CELLS}sBBB")
+
 
 class Game:
-    def __init__(self, board: Board):
+    def __init__(
+        self,
+        board: Board,
+        move_cache: Optional[MoveCache] = None,
+        light_born_off_num: int = 0,
+        dark_born_off_num: int = 0,
+    ):
         self._board = board
-        self._light_born_off_num = 0
-        self._dark_born_off_num = 0
+        self._move_cache = move_cache
+        self._light_born_off_num = light_born_off_num
+        self._dark_born_off_num = dark_born_off_num
+
+    def to_bytes(self, to_move: Color) -> bytes:
+        return GAME_STRUCT.pack(
+            self._board.to_bytes(),
+            self._light_born_off_num,
+            self._dark_born_off_num,
+            to_move.value,
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Tuple["Game", Color]:
+        if len(data) != GAME_STRUCT.size:
+            raise ValueError(
+                f"game data of {len(data)} bytes, expected {GAME_STRUCT.size}"
+            )
+        cells, light_born_off_num, dark_born_off_num, to_move = (
+            GAME_STRUCT.unpack(data)
+        )
+        game = cls(
+            Board.from_bytes(cells),
+            light_born_off_num=light_born_off_num,
+            dark_born_off_num=dark_born_off_num,
+        )
+
+        for color in Color:
+            pieces_on_board = game.board.features(color)[PIECES_ON_BOARD]
+            if pieces_on_board + game.born_off_num(color) > TOTAL_PIECES:
+                raise ValueError(
+                    f"more than 15 {color.name} pieces on the board and "
+                    f"born off"
+                )
+
+        return game, Color(to_move)
+
+    @property
+    def board(self) -> Board:
+        return self._board
+
+    def born_off_num(self, color: Color) -> int:
+        if color == Color.LIGHT:
+            return self._light_born_off_num
+        else:
+            return self._dark_born_off_num
+
+    @property
+    def winner(self) -> Optional[Color]:
+        for color in Color:
+            if self.born_off_num(color) == TOTAL_PIECES:
+                return color
+        return None
+
+    def make_move(self, move: Move):
+        for piece, step_len in move:
+            if self._board.is_bear_off(piece, step_len):
+                if piece.color == Color.LIGHT:
+                    self._light_born_off_num += 1
+                else:
+                    self._dark_born_off_num += 1
+
+            self._board.move_piece(piece, step_len)
+
+    def zobrist_key(self, to_move: Color) -> int:
+        return (
+            self._board.zobrist_key
+            ^ ZOBRIST_TO_MOVE_KEYS[to_move]
+            ^ ZOBRIST_BORN_OFF_KEYS[Color.LIGHT][self._light_born_off_num]
+            ^ ZOBRIST_BORN_OFF_KEYS[Color.DARK][self._dark_born_off_num]
+        )
 
     @staticmethod
     def is_head_piece(piece: Piece):
@@ -19,55 +126,214 @@ class Game:
         )
 
     def is_home(self, color: Color) -> bool:
-        last_piece = self._board.get_last_piece(color)
-        if not last_piece:
-            return False
+        return self._board.is_home(color)
 
-        if color == Color.LIGHT:
-            return 18 <= last_piece.position
-        else:
-            return 6 <= last_piece.position <= 11
+    def _iter_step_sequences(
+        self,
+        color: Color,
+        seq: Tuple[int, ...],
+        move: Move = (),
+        was_head_move_made: bool = False,
+    ) -> Iterator[Move]:
+        board = self._board
+        was_extended = False
 
-    def _find_step_sequence(
-        self, color: Color, seq: Iterable[int]
-    ) -> List[Move]:
-        moves: List[Tuple[Move, Board, bool]] = [((), self._board, False)]
+        if seq:
+            step_len = seq[0]
+
+            # identical steps commute, so they are only tried in cell order
+            min_order = -1
+            if move and move[-1][1] == step_len:
+                min_order = cell_order(color, move[-1][0].position)
+
+            for piece in board.find_movable_pieces(color, step_len):
+                is_head_move = self.is_head_piece(piece)
+                if was_head_move_made and is_head_move:
+                    continue
+                if cell_order(color, piece.position) < min_order:
+                    continue
+
+                board.apply_step(piece, step_len)
+                try:
+                    for extended_move in self._iter_step_sequences(
+                        color,
+                        seq[1:],
+                        move + ((piece, step_len),),
+                        was_head_move_made or is_head_move,
+                    ):
+                        was_extended = True
+                        yield extended_move
+                finally:
+                    board.undo_step(piece, step_len)
+
+        # a move may stop short only when no legal continuation exists
+        if not was_extended and not board.has_illegal_prime(color):
+            yield move
 
-        for step_len in seq:
-            extended_moves = []
+    def _iter_race_step_sequences(
+        self,
+        color: Color,
+        seq: Tuple[int, ...],
+        counts: List[int],
+        move: Move = (),
+    ) -> Iterator[Move]:
+        # _iter_step_sequences for non-contact positions: steps can't be
+        # blocked, the head rule can't apply (no head piece is left once the
+        # colors have passed each other) and no prime can be illegal, so
+        # only the color's own piece counts are tracked, by route order
+        was_extended = False
 
-            for move, board, was_head_move_made in moves:
-                pieces = board.find_movable_pieces(color, step_len)
+        if seq:
+            step_len = seq[0]
 
-                for piece in pieces:
-                    is_head_move = self.is_head_piece(piece)
-                    if was_head_move_made and is_head_move:
+            min_order = -1
+            if move and move[-1][1] == step_len:
+                min_order = cell_order(color, move[-1][0].position)
+
+            last_order = next(
+                (order for order, n_pieces in enumerate(counts) if n_pieces),
+                NUM_CELLS,
+            )
+            is_home = last_order >= HOME_ORDER
+            pieces = PIECES[color]
+
+            for position, order in enumerate(CELL_ROUTE_ORDERS[color]):
+                if not counts[order] or order < min_order:
+                    continue
+
+                target = order + step_len
+                if target >= NUM_CELLS and not (
+                    is_home and (target == NUM_CELLS or order == last_order)
+                ):
+                    continue
+
+                counts[order] -= 1
+                if target < NUM_CELLS:
+                    counts[target] += 1
+                try:
+                    for extended_move in self._iter_race_step_sequences(
+                        color,
+                        seq[1:],
+                        counts,
+                        move + ((pieces[position], step_len),),
+                    ):
+                        was_extended = True
+                        yield extended_move
+                finally:
+                    counts[order] += 1
+                    if target < NUM_CELLS:
+                        counts[target] -= 1
+
+        if not was_extended:
+            yield move
+
+    @staticmethod
+    def _step_sequences(dice: Tuple[int, int]) -> Tuple[Tuple[int, ...], ...]:
+        first_die, second_die = dice
+        if first_die == second_die:
+            return (first_die,) * 4,
+        return tuple(dice), tuple(reversed(dice))
+
+    def _find_max_move_len(self, color: Color, dice: Tuple[int, int]) -> int:
+        max_move_len = 0
+
+        for seq in self._step_sequences(dice):
+            with closing(self._iter_step_sequences(color, seq)) as moves:
+                for move in moves:
+                    max_move_len = max(max_move_len, len(move))
+                    if max_move_len == len(seq):
+                        return max_move_len
+
+        return max_move_len
+
+    def iter_moves(
+        self, color: Color, dice: Tuple[int, int], unique: bool = False
+    ) -> Iterator[Move]:
+        """
+        Yields the same moves as find_moves, one at a time. While a move is
+        being handled by the caller the board is left in the position that
+        move leads to; it is restored once the iterator is exhausted or
+        closed.
+        """
+        dice = tuple(sorted(dice, reverse=True))
+        max_move_len = self._find_max_move_len(color, dice)
+        if max_move_len == 0:
+            return
+
+        seen_positions = set()
+
+        for seq in self._step_sequences(dice):
+            with closing(self._iter_step_sequences(color, seq)) as moves:
+                for move in moves:
+                    if len(move) != max_move_len:
                         continue
 
-                    step = (piece, step_len)
-                    updated_board = copy.copy(board)
-                    updated_board.move_piece(*step)
-                    extended_move = move + (step,)
-                    extended_moves.append(
-                        (
-                            extended_move,
-                            updated_board,
-                            was_head_move_made or is_head_move,
-                        )
-                    )
-
-            if not extended_moves:
-                break
-
-            moves = extended_moves
-
-        return [move for move, _, __ in moves]
-
-    def find_moves(self, color: Color, dice: Tuple[int, int]) -> List[Move]:
-        moves = (
-            self._find_step_sequence(color, dice)
-            + self._find_step_sequence(color, reversed(dice))
-        )
-        max_move_len = max(len(move) for move in moves)
+                    if unique:
+                        key = self._board.position_key()
+                        if key in seen_positions:
+                            continue
+                        seen_positions.add(key)
+
+                    yield move
+
+    def find_moves(
+        self, color: Color, dice: Tuple[int, int], unique: bool = False
+    ) -> Sequence[Move]:
+        # both dice orders are searched anyway, so ordering the roll lets
+        # (3, 5) and (5, 3) share cache and opening table entries
+        dice = tuple(sorted(dice, reverse=True))
+
+        if self._move_cache is None:
+            return self._find_moves(color, dice, unique)
+
+        key = (self._board.zobrist_key, color, dice, unique)
+        moves = self._move_cache.get(key)
+
+        if moves is None:
+            moves = tuple(self._find_moves(color, dice, unique))
+            self._move_cache.put(key, moves)
+
+        return moves
+
+    def _find_moves(
+        self, color: Color, dice: Tuple[int, int], unique: bool
+    ) -> List[Move]:
+        if is_initial_position(self._board):
+            moves = get_opening_moves(color, dice, unique)
+            if moves is not None:
+                return moves
+
+        return self._search_moves(color, dice, unique)
+
+    def _search_moves(
+        self, color: Color, dice: Tuple[int, int], unique: bool
+    ) -> List[Move]:
+        moves: Dict[Hashable, Move] = {}
+        max_move_len = 0
+
+        if self._board.is_non_contact():
+            # the opposite pieces are untouched, so the own counts identify
+            # the resulting position
+            counts = self._board.route_counts(color)
+            iter_sequences = partial(
+                self._iter_race_step_sequences, color, counts=counts
+            )
+            position_key = partial(tuple, counts)
+        else:
+            iter_sequences = partial(self._iter_step_sequences, color)
+            position_key = self._board.position_key
+
+        for seq in self._step_sequences(dice):
+            for move in iter_sequences(seq):
+                if len(move) < max_move_len:
+                    continue
+                if len(move) > max_move_len:
+                    max_move_len = len(move)
+                    moves = {}
+
+                # the board (or the counts) is in the move's resulting
+                # position while the generator is suspended on it
+                key = position_key() if unique else len(moves)
+                moves.setdefault(key, move)
 
-        return [move for move in moves if move and len(move) == max_move_len]
+        return [move for move in moves.values() if move]
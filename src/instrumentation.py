@@ -0,0 +1,204 @@
+import argparse
+import functools
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from board import Board
+from game import Game
+from selfplay import game_seed, play_game
+
+# how a wrapped method is measured:
+# CALL counts calls and their cumulative time,
+# SIZED also records the length of the returned sequence (branching factor),
+# GENERATOR counts calls and yielded items, without timing every resume,
+# TREE times the call and records how many step-search nodes it visited
+CALL = "call"
+SIZED = "sized"
+GENERATOR = "generator"
+TREE = "tree"
+
+Target = Tuple[type, str, str]
+
+DEFAULT_TARGETS: List[Target] = [
+    (Board, "__copy__", CALL),
+    (Board, "find_movable_pieces", SIZED),
+    (Board, "move_piece", CALL),
+    (Board, "apply_step", CALL),
+    (Board, "undo_step", CALL),
+    (Game, "find_moves", SIZED),
+    (Game, "_search_moves", TREE),
+    (Game, "_iter_step_sequences", GENERATOR),
+    (Game, "_iter_race_step_sequences", GENERATOR),
+]
+
+# every call of a step-search generator is a node of the search tree
+NODE_COUNTERS = [
+    "Game._iter_step_sequences",
+    "Game._iter_race_step_sequences",
+]
+
+
+@dataclass
+class CallStats:
+    calls: int = 0
+    total_time: float = 0.0
+    items: int = 0
+    max_items: int = 0
+
+    def clear(self):
+        self.calls = 0
+        self.total_time = 0.0
+        self.items = 0
+        self.max_items = 0
+
+    def add_items(self, n_items: int):
+        self.items += n_items
+        self.max_items = max(self.max_items, n_items)
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.calls if self.calls else 0.0
+
+    @property
+    def mean_items(self) -> float:
+        return self.items / self.calls if self.calls else 0.0
+
+
+class Instrumentation:
+    """
+    Opt-in counters and timers for the hot paths of Board and Game. The
+    methods are only wrapped while the instrumentation is entered as a
+    context manager, so there is no cost when it is disabled:
+
+        with Instrumentation() as instrumentation:
+            game.find_moves(Color.LIGHT, (6, 5))
+        print(instrumentation.report())
+
+    Timers are cumulative: time spent in nested instrumented calls is also
+    counted by their callers.
+    """
+
+    _active: Optional["Instrumentation"] = None
+
+    def __init__(self, targets: Optional[List[Target]] = None):
+        self._targets = DEFAULT_TARGETS if targets is None else targets
+        self._originals: List[Tuple[type, str, Any]] = []
+        self.stats: Dict[str, CallStats] = defaultdict(CallStats)
+
+    def __enter__(self) -> "Instrumentation":
+        if Instrumentation._active is not None:
+            raise RuntimeError("instrumentation is already enabled")
+        Instrumentation._active = self
+
+        try:
+            for owner, name, kind in self._targets:
+                original = owner.__dict__[name]
+                self._originals.append((owner, name, original))
+                setattr(owner, name, self._wrap(
+                    f"{owner.__name__}.{name}", kind, original
+                ))
+        except BaseException:
+            # a target that doesn't resolve mustn't leave the others patched
+            self._restore()
+            raise
+        return self
+
+    def __exit__(self, *exc_info):
+        self._restore()
+
+    def _restore(self):
+        for owner, name, original in reversed(self._originals):
+            setattr(owner, name, original)
+        self._originals = []
+        Instrumentation._active = None
+
+    def reset(self):
+        # the wrappers hold on to their stats, so they are cleared in place
+        for stats in self.stats.values():
+            stats.clear()
+
+    def _wrap(self, stat_name: str, kind: str, original: Any) -> Any:
+        is_static = isinstance(original, staticmethod)
+        function = original.__func__ if is_static else original
+        stats = self.stats[stat_name]
+        node_counters = [self.stats[name] for name in NODE_COUNTERS]
+        perf_counter = time.perf_counter
+
+        def count_nodes() -> int:
+            return sum(nodes.calls for nodes in node_counters)
+
+        if kind == GENERATOR:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs) -> Iterator:
+                stats.calls += 1
+                n_items = 0
+                try:
+                    for item in function(*args, **kwargs):
+                        n_items += 1
+                        yield item
+                finally:
+                    stats.add_items(n_items)
+        else:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if kind == TREE:
+                    nodes_before = count_nodes()
+                started_at = perf_counter()
+                try:
+                    result = function(*args, **kwargs)
+                finally:
+                    stats.total_time += perf_counter() - started_at
+                    stats.calls += 1
+
+                if kind == SIZED:
+                    stats.add_items(len(result))
+                elif kind == TREE:
+                    stats.add_items(count_nodes() - nodes_before)
+                return result
+
+        return staticmethod(wrapper) if is_static else wrapper
+
+    def export(self) -> Dict[str, float]:
+        counters = {}
+        for name, stats in sorted(self.stats.items()):
+            counters[f"{name}.calls"] = stats.calls
+            counters[f"{name}.total_time"] = stats.total_time
+            counters[f"{name}.items"] = stats.items
+            counters[f"{name}.max_items"] = stats.max_items
+        return counters
+
+    def report(self) -> str:
+        lines = [
+            f"{'method':<32} {'calls':>10} {'total s':>9} {'us/call':>9} "
+            f"{'items/call':>10} {'max':>6}"
+        ]
+        for name, stats in sorted(
+            self.stats.items(), key=lambda item: -item[1].total_time
+        ):
+            lines.append(
+                f"{name:<32} {stats.calls:>10} {stats.total_time:>9.3f} "
+                f"{stats.mean_time * 1e6:>9.2f} {stats.mean_items:>10.2f} "
+                f"{stats.max_items:>6}"
+            )
+        return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report hot-path statistics of self-play games"
+    )
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with Instrumentation() as instrumentation:
+        for game_num in range(args.games):
+            play_game(game_seed(args.seed, game_num))
+
+    print(instrumentation.report())
+
+
+if __name__ == "__main__":
+    main()
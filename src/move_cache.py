@@ -0,0 +1,40 @@
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+from types_ import Move
+
+
+class MoveCache:
+    def __init__(self, maxsize: int = 4096):
+        assert maxsize > 0, "cache size must be positive"
+
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[Move, ...]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Tuple[Move, ...]]:
+        moves = self._entries.get(key)
+
+        if moves is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+
+        return moves
+
+    def put(self, key: Hashable, moves: Tuple[Move, ...]):
+        self._entries[key] = moves
+        self._entries.move_to_end(key)
+
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,95 @@
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+from board import PIECES, Board
+from types_ import Color, Move
+
+OPENING_TABLE_VERSION = 2
+OPENING_TABLE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "opening_moves.json"
+)
+
+ROLLS = [(high, low) for high in range(1, 7) for low in range(1, high + 1)]
+
+OpeningTable = Dict[Tuple[Color, Tuple[int, int], bool], List[Move]]
+
+_opening_table: Optional[OpeningTable] = None
+_initial_position_key = Board().position_key()
+
+
+def is_initial_position(board: Board) -> bool:
+    return board.position_key() == _initial_position_key
+
+
+def _table_key(color: Color, roll: Tuple[int, int], unique: bool) -> str:
+    high, low = roll
+    return f"{color.name} {high}-{low}{' unique' if unique else ''}"
+
+
+def generate_opening_table() -> dict:
+    from game import Game
+
+    moves = {}
+    for color in Color:
+        for roll in ROLLS:
+            for unique in (False, True):
+                moves[_table_key(color, roll, unique)] = [
+                    [[piece.position, step_len] for piece, step_len in move]
+                    for move in Game(Board())._search_moves(
+                        color, roll, unique
+                    )
+                ]
+
+    return {"version": OPENING_TABLE_VERSION, "moves": moves}
+
+
+def _load_opening_table(path: str) -> Optional[OpeningTable]:
+    if not os.path.exists(path):
+        return None
+
+    with open(path) as table_file:
+        raw_table = json.load(table_file)
+
+    if raw_table["version"] != OPENING_TABLE_VERSION:
+        return None
+
+    table = {}
+    for color in Color:
+        for roll in ROLLS:
+            for unique in (False, True):
+                table[(color, roll, unique)] = [
+                    tuple(
+                        (PIECES[color][position], step_len)
+                        for position, step_len in move
+                    )
+                    for move in raw_table["moves"][
+                        _table_key(color, roll, unique)
+                    ]
+                ]
+
+    return table
+
+
+def get_opening_moves(
+    color: Color, dice: Tuple[int, int], unique: bool
+) -> Optional[List[Move]]:
+    global _opening_table
+
+    if _opening_table is None:
+        _opening_table = _load_opening_table(OPENING_TABLE_PATH) or {}
+
+    moves = _opening_table.get((color, tuple(dice), unique))
+    if moves is None:
+        return None
+
+    return list(moves)
+
+
+def main():
+    with open(OPENING_TABLE_PATH, "w") as table_file:
+        json.dump(generate_opening_table(), table_file, separators=(",", ":"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from board import Board
+from game import Game
+from opening_table import ROLLS
+from types_ import Color
+
+TranspositionTable = Dict[Tuple[int, Color, int], int]
+
+
+@dataclass
+class PerftResult:
+    nodes: int
+    elapsed: float
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.elapsed if self.elapsed else 0.0
+
+
+def _is_finished(board: Board) -> bool:
+    return any(board.occupancy_mask(color) == 0 for color in Color)
+
+
+def _count_nodes(
+    board: Board,
+    color: Color,
+    depth: int,
+    table: Optional[TranspositionTable],
+) -> int:
+    if depth == 0 or _is_finished(board):
+        return 1
+
+    if table is not None:
+        key = (board.zobrist_key, color, depth)
+        nodes = table.get(key)
+        if nodes is not None:
+            return nodes
+
+    game = Game(board)
+    nodes = 0
+    for roll in ROLLS:
+        moves = game.find_moves(color, roll)
+        if not moves:
+            # the turn passes to the other side
+            nodes += _count_nodes(board, color.opposite, depth - 1, table)
+            continue
+
+        for move in moves:
+            for step in move:
+                board.apply_step(*step)
+            nodes += _count_nodes(board, color.opposite, depth - 1, table)
+            for step in reversed(move):
+                board.undo_step(*step)
+
+    if table is not None:
+        table[key] = nodes
+
+    return nodes
+
+
+def _count_subtree_nodes(
+    position_key: bytes, color: Color, depth: int, use_table: bool
+) -> int:
+    return _count_nodes(
+        Board.from_position_key(position_key),
+        color,
+        depth,
+        {} if use_table else None,
+    )
+
+
+def _root_children(board: Board, color: Color) -> List[bytes]:
+    game = Game(board)
+    children = []
+    for roll in ROLLS:
+        moves = game.find_moves(color, roll) or [()]
+        for move in moves:
+            for step in move:
+                board.apply_step(*step)
+            children.append(board.position_key())
+            for step in reversed(move):
+                board.undo_step(*step)
+
+    return children
+
+
+def perft(
+    board: Board,
+    color: Color,
+    depth: int,
+    workers: int = 1,
+    use_table: bool = False,
+) -> PerftResult:
+    """
+    Counts leaf positions of the move tree where every ply expands all 21
+    distinct rolls for the side to move; colors alternate between plies.
+    """
+    started_at = time.perf_counter()
+
+    if workers == 1 or depth == 0 or _is_finished(board):
+        nodes = _count_nodes(
+            board, color, depth, {} if use_table else None
+        )
+    else:
+        children = _root_children(board, color)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            nodes = sum(executor.map(
+                _count_subtree_nodes,
+                children,
+                [color.opposite] * len(children),
+                [depth - 1] * len(children),
+                [use_table] * len(children),
+            ))
+
+    return PerftResult(nodes=nodes, elapsed=time.perf_counter() - started_at)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Count move tree leaves from the starting position"
+    )
+    parser.add_argument("depth", type=int)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--table", action="store_true")
+    args = parser.parse_args()
+
+    result = perft(
+        Board(), Color.LIGHT, args.depth, args.workers, args.table
+    )
+    print(f"nodes: {result.nodes}")
+    print(f"{result.nodes_per_second:.0f} nodes/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import argparse
+import copy
+import sys
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional, Tuple
+
+from board import NUM_CELLS, PIECES, Board
+from game import Game
+from types_ import Color, Move
+
+Dice = Tuple[int, int]
+RecordedMove = Tuple[Tuple[int, int], ...]
+Turn = Tuple[Dice, RecordedMove]
+
+
+class RecordError(Exception):
+    pass
+
+
+@dataclass
+class ReplayResult:
+    game_num: int
+    n_turns: int
+    winner: Optional[Color]
+    error: Optional[str] = None
+
+
+def format_turn(dice: Dice, move: Move) -> str:
+    steps = ",".join(f"{piece.position}/{step_len}" for piece, step_len in move)
+    return f"{dice[0]}{dice[1]}:{steps}"
+
+
+def format_game(turns: Iterable[Tuple[Dice, Move]]) -> str:
+    """
+    A game is recorded on one line as space separated turns; LIGHT makes the
+    first turn and colors alternate. A turn is the roll followed by the
+    steps of the chosen move, e.g. "65:0/6,6/5", or "65:" when no move was
+    possible.
+    """
+    return " ".join(format_turn(dice, move) for dice, move in turns)
+
+
+def parse_turn(token: str) -> Turn:
+    try:
+        dice_part, steps_part = token.split(":")
+        dice = (int(dice_part[0]), int(dice_part[1]))
+        if len(dice_part) != 2 or not all(1 <= die <= 6 for die in dice):
+            raise ValueError(dice_part)
+
+        move = tuple(
+            tuple(int(value) for value in step.split("/"))
+            for step in steps_part.split(",")
+            if step
+        )
+        if any(
+            len(step) != 2
+            or not 0 <= step[0] < NUM_CELLS
+            or not 1 <= step[1] <= 6
+            for step in move
+        ):
+            raise ValueError(steps_part)
+    except (ValueError, IndexError):
+        raise RecordError(f"malformed turn {token!r}")
+
+    return dice, move
+
+
+def parse_game(line: str) -> Iterator[Turn]:
+    return (parse_turn(token) for token in line.split())
+
+
+def _to_move(color: Color, recorded_move: RecordedMove) -> Move:
+    # PIECES is a tuple, so a negative position would silently wrap around
+    if any(not 0 <= position < NUM_CELLS for position, _ in recorded_move):
+        raise RecordError(f"position out of range in {recorded_move}")
+    return tuple(
+        (PIECES[color][position], step_len)
+        for position, step_len in recorded_move
+    )
+
+
+def _resulting_position(board: Board, move: Move) -> Optional[bytes]:
+    # None when a step doesn't start from a piece of the mover's color or
+    # can't be made on the board
+    board = copy.copy(board)
+    for piece, step_len in move:
+        if (
+            board.get_piece(piece.position) != piece
+            or not board.can_move_piece(piece, step_len)
+        ):
+            return None
+        board.move_piece(piece, step_len)
+    return board.position_key()
+
+
+def _find_legal_move(
+    game: Game, color: Color, dice: Dice, recorded_move: RecordedMove
+) -> Optional[Move]:
+    legal_moves = game.find_moves(color, dice)
+    if not legal_moves:
+        return () if not recorded_move else None
+
+    for move in legal_moves:
+        if tuple((piece.position, step_len) for piece, step_len in move) == (
+            recorded_move
+        ):
+            return move
+
+    # the generator tries identical steps in one order only, so a recorded
+    # double may be another order of the same legal move
+    first_die, second_die = dice
+    if first_die != second_die or len(recorded_move) != len(legal_moves[0]):
+        return None
+    if any(step_len != first_die for _, step_len in recorded_move):
+        return None
+
+    move = _to_move(color, recorded_move)
+    position = _resulting_position(game.board, move)
+    if position is None:
+        return None
+
+    legal_positions = {
+        _resulting_position(game.board, legal_move)
+        for legal_move in legal_moves
+    }
+    return move if position in legal_positions else None
+
+
+def replay_game(game_num: int, turns: Iterable[Turn]) -> ReplayResult:
+    game = Game(Board())
+    color = Color.LIGHT
+    n_turns = 0
+
+    try:
+        for dice, recorded_move in turns:
+            if game.winner is not None:
+                raise RecordError("turn after the end of the game")
+
+            move = _find_legal_move(game, color, dice, recorded_move)
+            if move is None:
+                turn = format_turn(dice, _to_move(color, recorded_move))
+                raise RecordError(f"illegal move {turn} for {color.name}")
+
+            game.make_move(move)
+            n_turns += 1
+            color = color.opposite
+    except RecordError as error:
+        return ReplayResult(
+            game_num=game_num,
+            n_turns=n_turns,
+            winner=None,
+            error=f"turn {n_turns + 1}: {error}",
+        )
+
+    return ReplayResult(game_num=game_num, n_turns=n_turns, winner=game.winner)
+
+
+def replay_stream(lines: Iterable[str]) -> Iterator[ReplayResult]:
+    game_num = 0
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+
+        yield replay_game(game_num, parse_game(line))
+        game_num += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify recorded games")
+    parser.add_argument(
+        "records",
+        nargs="?",
+        type=argparse.FileType("r"),
+        default=sys.stdin,
+        help="game records, one game per line; stdin by default",
+    )
+    args = parser.parse_args()
+
+    n_games = n_errors = 0
+    for result in replay_stream(args.records):
+        n_games += 1
+        if result.error:
+            n_errors += 1
+            print(f"game {result.game_num}: {result.error}")
+
+    print(f"{n_games} games replayed, {n_errors} invalid")
+    if n_errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from board import Board
+from game import Game
+from opening_table import ROLLS
+from types_ import Color, Move
+
+WIN_VALUE = 1.0
+LOSS_VALUE = -1.0
+
+Evaluator = Callable[[Board, Color], float]
+
+ROLL_PROBABILITIES = [
+    (roll, (1 if roll[0] == roll[1] else 2) / 36) for roll in ROLLS
+]
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+def race_evaluator(board: Board, color: Color) -> float:
+    own_pips = board.pip_count(color)
+    opposite_pips = board.pip_count(color.opposite)
+    return (opposite_pips - own_pips) / (own_pips + opposite_pips + 1)
+
+
+@dataclass
+class SearchResult:
+    move: Optional[Move]
+    value: float
+    depth: int
+    nodes: int
+
+
+class Searcher:
+    """
+    Expectiminimax over the 21 distinct rolls with Star1/Star2 pruning at
+    chance nodes. Evaluators return values from the point of view of the
+    given color, bounded by LOSS_VALUE and WIN_VALUE.
+    """
+
+    def __init__(
+        self,
+        evaluator: Evaluator = race_evaluator,
+        max_depth: int = 2,
+        time_budget: Optional[float] = None,
+    ):
+        self._evaluator = evaluator
+        self._max_depth = max_depth
+        self._time_budget = time_budget
+        self._deadline: Optional[float] = None
+        self.nodes = 0
+
+    def choose_move(
+        self, board: Board, color: Color, dice: Tuple[int, int]
+    ) -> SearchResult:
+        self.nodes = 0
+        self._deadline = (
+            None if self._time_budget is None
+            else time.perf_counter() + self._time_budget
+        )
+
+        moves = self._ordered_moves(board, color, dice)
+        if not moves:
+            return SearchResult(move=None, value=0.0, depth=0, nodes=0)
+
+        result = None
+        for depth in range(1, self._max_depth + 1):
+            try:
+                best_move, best_value = self._search_root(
+                    board, color, moves, depth
+                )
+            except SearchTimeout:
+                break
+
+            result = SearchResult(
+                move=best_move, value=best_value, depth=depth, nodes=self.nodes
+            )
+            moves.remove(best_move)
+            moves.insert(0, best_move)
+
+        if result is None:
+            # not even depth 1 finished in time, fall back to the move the
+            # evaluator ordered first
+            result = SearchResult(
+                move=moves[0],
+                value=self._static_value(board, color, moves[0]),
+                depth=0,
+                nodes=self.nodes,
+            )
+
+        result.nodes = self.nodes
+        return result
+
+    def _static_value(self, board: Board, color: Color, move: Move) -> float:
+        for step in move:
+            board.apply_step(*step)
+        try:
+            return self._evaluator(board, color)
+        finally:
+            for step in reversed(move):
+                board.undo_step(*step)
+
+    def _search_root(
+        self, board: Board, color: Color, moves: List[Move], depth: int
+    ) -> Tuple[Move, float]:
+        best_move, best_value = None, LOSS_VALUE - 1
+        for move in moves:
+            value = self._move_value(
+                board, color, move, depth, max(best_value, LOSS_VALUE), WIN_VALUE
+            )
+            if value > best_value:
+                best_move, best_value = move, value
+
+        return best_move, best_value
+
+    def _check_time(self):
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            raise SearchTimeout()
+
+    def _ordered_moves(
+        self, board: Board, color: Color, dice: Tuple[int, int]
+    ) -> List[Move]:
+        scored_moves = []
+        for move in Game(board).find_moves(color, dice, unique=True):
+            for step in move:
+                board.apply_step(*step)
+            scored_moves.append((self._evaluator(board, color), move))
+            for step in reversed(move):
+                board.undo_step(*step)
+
+        scored_moves.sort(key=lambda scored_move: -scored_move[0])
+        return [move for _, move in scored_moves]
+
+    def _move_value(
+        self,
+        board: Board,
+        color: Color,
+        move: Move,
+        depth: int,
+        alpha: float,
+        beta: float,
+    ) -> float:
+        for step in move:
+            board.apply_step(*step)
+        try:
+            if board.occupancy_mask(color) == 0:
+                return WIN_VALUE
+            return -self._chance_value(
+                board, color.opposite, depth - 1, -beta, -alpha
+            )
+        finally:
+            for step in reversed(move):
+                board.undo_step(*step)
+
+    def _max_value(
+        self,
+        board: Board,
+        color: Color,
+        moves: List[Move],
+        depth: int,
+        alpha: float,
+        beta: float,
+        best_value: float = LOSS_VALUE,
+        first_move: int = 0,
+    ) -> float:
+        self.nodes += 1
+
+        if not moves:
+            return -self._chance_value(
+                board, color.opposite, depth - 1, -beta, -alpha
+            )
+
+        for move in moves[first_move:]:
+            if best_value >= beta:
+                break
+            value = self._move_value(
+                board, color, move, depth, max(alpha, best_value), beta
+            )
+            best_value = max(best_value, value)
+
+        return best_value
+
+    def _chance_value(
+        self,
+        board: Board,
+        color: Color,
+        depth: int,
+        alpha: float,
+        beta: float,
+    ) -> float:
+        self.nodes += 1
+
+        if depth == 0:
+            return self._evaluator(board, color)
+
+        self._check_time()
+
+        outcomes = [
+            (probability, self._ordered_moves(board, color, roll))
+            for roll, probability in ROLL_PROBABILITIES
+        ]
+        lower_bounds = [LOSS_VALUE] * len(outcomes)
+
+        # Star2: the value of the first move of every outcome is a lower
+        # bound of that outcome, which may be enough for a cutoff
+        lower_sum = LOSS_VALUE
+        for i, (probability, moves) in enumerate(outcomes):
+            if not moves:
+                continue
+
+            probe_beta = (beta - lower_sum) / probability + LOSS_VALUE
+            probe_value = self._move_value(
+                board, color, moves[0], depth, LOSS_VALUE,
+                min(probe_beta, WIN_VALUE),
+            )
+            lower_bounds[i] = probe_value
+            lower_sum += probability * (probe_value - LOSS_VALUE)
+            if lower_sum >= beta:
+                return lower_sum
+
+        # Star1: search every outcome with the window that can still change
+        # the result given the bounds of the remaining outcomes
+        exact_sum = 0.0
+        rest_lower = lower_sum
+        rest_upper = WIN_VALUE
+        for i, (probability, moves) in enumerate(outcomes):
+            rest_lower -= probability * lower_bounds[i]
+            rest_upper -= probability * WIN_VALUE
+
+            child_alpha = (alpha - exact_sum - rest_upper) / probability
+            child_beta = (beta - exact_sum - rest_lower) / probability
+            if child_alpha >= WIN_VALUE:
+                return exact_sum + probability * WIN_VALUE + rest_upper
+
+            value = self._max_value(
+                board,
+                color,
+                moves,
+                depth,
+                max(child_alpha, LOSS_VALUE),
+                min(child_beta, WIN_VALUE),
+                best_value=lower_bounds[i],
+                first_move=1 if moves else 0,
+            )
+
+            if value <= child_alpha:
+                return exact_sum + probability * value + rest_upper
+            if value >= child_beta:
+                return exact_sum + probability * value + rest_lower
+
+            exact_sum += probability * value
+
+        return exact_sum
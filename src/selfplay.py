@@ -0,0 +1,148 @@
+import argparse
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from board import Board
+from game import Game
+from types_ import Color, Move
+
+Dice = Tuple[int, int]
+Policy = Callable[[Game, Color, Dice, Sequence[Move], random.Random], Move]
+
+DEFAULT_MAX_TURNS = 500
+
+
+@dataclass
+class GameResult:
+    seed: str
+    winner: Optional[Color]
+    n_turns: int
+
+
+@dataclass
+class SelfPlaySummary:
+    results: List[GameResult]
+    elapsed: float
+    wins: Dict[Optional[Color], int] = field(init=False)
+
+    def __post_init__(self):
+        self.wins = {color: 0 for color in [*Color, None]}
+        for result in self.results:
+            self.wins[result.winner] += 1
+
+    @property
+    def games_per_second(self) -> float:
+        return len(self.results) / self.elapsed if self.elapsed else 0.0
+
+
+def random_policy(
+    game: Game,
+    color: Color,
+    dice: Dice,
+    moves: Sequence[Move],
+    rng: random.Random,
+) -> Move:
+    return rng.choice(moves)
+
+
+def roll_dice(rng: random.Random) -> Dice:
+    return rng.randint(1, 6), rng.randint(1, 6)
+
+
+def game_seed(seed: int, game_num: int) -> str:
+    # every game owns its seed stream, so results don't depend on how
+    # games are split between worker processes
+    return f"{seed}-{game_num}"
+
+
+def play_game(
+    seed: str,
+    policy: Policy = random_policy,
+    max_turns: int = DEFAULT_MAX_TURNS,
+) -> GameResult:
+    rng = random.Random(seed)
+    game = Game(Board())
+    color = Color.LIGHT
+
+    for turn in range(max_turns):
+        dice = roll_dice(rng)
+        moves = game.find_moves(color, dice)
+        if moves:
+            game.make_move(policy(game, color, dice, moves, rng))
+
+        if game.winner is not None:
+            return GameResult(seed=seed, winner=game.winner, n_turns=turn + 1)
+
+        color = color.opposite
+
+    return GameResult(seed=seed, winner=None, n_turns=max_turns)
+
+
+def _play_chunk(
+    seeds: List[str], policy: Policy, max_turns: int
+) -> List[GameResult]:
+    return [play_game(seed, policy, max_turns) for seed in seeds]
+
+
+def run_selfplay(
+    n_games: int,
+    seed: int = 0,
+    policy: Policy = random_policy,
+    workers: Optional[int] = None,
+    chunk_size: int = 8,
+    max_turns: int = DEFAULT_MAX_TURNS,
+) -> SelfPlaySummary:
+    seeds = [game_seed(seed, game_num) for game_num in range(n_games)]
+    chunks = [
+        seeds[start:start + chunk_size]
+        for start in range(0, n_games, chunk_size)
+    ]
+
+    started_at = time.perf_counter()
+
+    if workers == 1:
+        chunk_results = [
+            _play_chunk(chunk, policy, max_turns) for chunk in chunks
+        ]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunk_results = list(executor.map(
+                _play_chunk,
+                chunks,
+                [policy] * len(chunks),
+                [max_turns] * len(chunks),
+            ))
+
+    return SelfPlaySummary(
+        results=[result for chunk in chunk_results for result in chunk],
+        elapsed=time.perf_counter() - started_at,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run self-play games")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=8)
+    parser.add_argument("--max-turns", type=int, default=DEFAULT_MAX_TURNS)
+    args = parser.parse_args()
+
+    summary = run_selfplay(
+        args.games,
+        seed=args.seed,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        max_turns=args.max_turns,
+    )
+
+    for color, n_wins in summary.wins.items():
+        print(f"{color.name if color else 'unfinished'}: {n_wins}")
+    print(f"{summary.games_per_second:.1f} games/s")
+
+
+if __name__ == "__main__":
+    main()
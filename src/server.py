@@ -0,0 +1,475 @@
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import struct
+import time
+from array import array
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from board import PIECES, TOTAL_PIECES, Board
+from game import GAME_STRUCT, Game
+from types_ import Color
+
+Dice = Tuple[int, int]
+RecordedMove = Tuple[Tuple[int, int], ...]
+
+DEFAULT_MAX_BATCH = 64
+DEFAULT_MAX_DELAY = 0.002
+
+
+class RequestError(Exception):
+    pass
+
+
+def find_moves_chunk(
+    requests: Sequence[Tuple[bytes, Dice]]
+) -> List[List[RecordedMove]]:
+    # runs in the worker pool, so positions travel as Game.to_bytes() and
+    # moves come back as plain (position, step length) pairs
+    results = []
+    for position, dice in requests:
+        game, color = Game.from_bytes(position)
+        results.append([
+            tuple((piece.position, step_len) for piece, step_len in move)
+            for move in game.find_moves(color, dice)
+        ])
+    return results
+
+
+class MoveBatcher:
+    def __init__(
+        self,
+        executor: Executor,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_delay: float = DEFAULT_MAX_DELAY,
+    ):
+        self._executor = executor
+        self._max_batch = max_batch
+        self._max_delay = max_delay
+        self._pending: List[Tuple[bytes, Dice, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+        self.n_batches = 0
+        self.n_requests = 0
+
+    async def find_moves(
+        self, position: bytes, dice: Dice
+    ) -> List[RecordedMove]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((position, dice, future))
+
+        if len(self._pending) >= self._max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._max_delay, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[bytes, Dice, asyncio.Future]]):
+        self.n_batches += 1
+        self.n_requests += len(batch)
+        loop = asyncio.get_running_loop()
+
+        try:
+            results = await loop.run_in_executor(
+                self._executor,
+                find_moves_chunk,
+                [(position, dice) for position, dice, _ in batch],
+            )
+        except Exception as error:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        for (_, _, future), moves in zip(batch, results):
+            if not future.done():
+                future.set_result(moves)
+
+
+@dataclass
+class Session:
+    game: Game
+    to_move: Color = Color.LIGHT
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+def _parse_dice(request: Dict[str, Any]) -> Dice:
+    dice = request.get("dice")
+    if (
+        not isinstance(dice, list)
+        or len(dice) != 2
+        or not all(isinstance(die, int) and 1 <= die <= 6 for die in dice)
+    ):
+        raise RequestError(f"invalid dice {dice!r}")
+    return dice[0], dice[1]
+
+
+def _parse_move(request: Dict[str, Any]) -> RecordedMove:
+    try:
+        return tuple((int(position), int(step_len))
+                     for position, step_len in request["move"])
+    except (KeyError, TypeError, ValueError):
+        raise RequestError(f"invalid move {request.get('move')!r}")
+
+
+def _parse_position(request: Dict[str, Any]) -> bytes:
+    try:
+        position = bytes.fromhex(request["position"])
+        cells, light_born_off_num, dark_born_off_num, to_move = (
+            GAME_STRUCT.unpack(position)
+        )
+        Color(to_move)
+    except (TypeError, ValueError, struct.error):
+        raise RequestError("invalid position")
+
+    values = array("b", cells)
+    light_pieces = sum(value for value in values if value > 0)
+    dark_pieces = -sum(value for value in values if value < 0)
+    if (
+        any(abs(value) > TOTAL_PIECES for value in values)
+        or light_pieces + light_born_off_num > TOTAL_PIECES
+        or dark_pieces + dark_born_off_num > TOTAL_PIECES
+    ):
+        raise RequestError("invalid position")
+
+    return position
+
+
+class GameServer:
+    """
+    Serves game sessions over newline-delimited JSON. Every request is an
+    object with an "op" and an optional "id" that is echoed in the reply:
+
+        {"op": "new"} -> {"session": 1}
+        {"op": "moves", "session": 1, "dice": [6, 5]} -> {"moves": [...]}
+        {"op": "moves", "position": "<Game.to_bytes hex>", "dice": [6, 5]}
+        {"op": "play", "session": 1, "dice": [6, 5], "move": [[0, 6], ...]}
+        {"op": "close", "session": 1}
+
+    Move generation is coalesced into batches by MoveBatcher and runs in the
+    executor, so the event loop only parses requests and owns sessions.
+    """
+
+    def __init__(
+        self,
+        executor: Optional[Executor] = None,
+        workers: Optional[int] = None,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_delay: float = DEFAULT_MAX_DELAY,
+    ):
+        self._owns_executor = executor is None
+        self._executor = executor or ProcessPoolExecutor(max_workers=workers)
+        self.batcher = MoveBatcher(self._executor, max_batch, max_delay)
+        self._sessions: Dict[int, Session] = {}
+        self._session_ids = itertools.count(1)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    @property
+    def n_sessions(self) -> int:
+        return len(self._sessions)
+
+    async def start(
+        self, host: str = "127.0.0.1", port: int = 0
+    ) -> Tuple[str, int]:
+        self._server = await asyncio.start_server(
+            self._handle_client, host, port
+        )
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+        # let open connections see EOF and finish their requests
+        for writer in self._connections.values():
+            writer.close()
+        if self._connections:
+            await asyncio.wait(list(self._connections))
+        if self._owns_executor:
+            self._executor.shutdown()
+
+    async def __aenter__(self) -> "GameServer":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        # requests on one connection are handled concurrently, replies are
+        # matched by their "id"
+        tasks = set()
+        self._connections[asyncio.current_task()] = writer
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                task = asyncio.ensure_future(self._reply(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            if tasks:
+                await asyncio.wait(tasks)
+        finally:
+            del self._connections[asyncio.current_task()]
+            writer.close()
+
+    async def _reply(self, line: bytes, writer: asyncio.StreamWriter):
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise RequestError("request must be an object")
+            request_id = request.get("id")
+            reply = await self.handle(request)
+        except (RequestError, json.JSONDecodeError) as error:
+            reply = {"error": str(error)}
+        except Exception as error:
+            # the client waits for a reply to every request, so unexpected
+            # errors (including ones forwarded from the pool) are reported
+            reply = {"error": f"internal error: {error!r}"}
+
+        reply["id"] = request_id
+        writer.write(json.dumps(reply).encode() + b"\n")
+
+    async def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        op = request.get("op")
+        if op == "new":
+            return self._new_session()
+        elif op == "moves":
+            return await self._moves(request)
+        elif op == "play":
+            return await self._play(request)
+        elif op == "close":
+            self._sessions.pop(self._get_session_id(request), None)
+            return {}
+        else:
+            raise RequestError(f"unknown op {op!r}")
+
+    def _new_session(self) -> Dict[str, Any]:
+        session_id = next(self._session_ids)
+        self._sessions[session_id] = Session(Game(Board()))
+        return {"session": session_id}
+
+    @staticmethod
+    def _get_session_id(request: Dict[str, Any]) -> int:
+        session_id = request.get("session")
+        if not isinstance(session_id, int):
+            raise RequestError(f"invalid session {session_id!r}")
+        return session_id
+
+    def _get_session(self, request: Dict[str, Any]) -> Session:
+        session_id = self._get_session_id(request)
+        try:
+            return self._sessions[session_id]
+        except KeyError:
+            raise RequestError(f"unknown session {session_id}")
+
+    async def _moves(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        dice = _parse_dice(request)
+
+        if "position" in request:
+            position = _parse_position(request)
+        else:
+            session = self._get_session(request)
+            position = session.game.to_bytes(session.to_move)
+
+        moves = await self.batcher.find_moves(position, dice)
+        return {"moves": moves}
+
+    async def _play(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        session = self._get_session(request)
+        dice = _parse_dice(request)
+        move = _parse_move(request)
+
+        async with session.lock:
+            game, color = session.game, session.to_move
+            if game.winner is not None:
+                raise RequestError("game is over")
+
+            legal_moves = await self.batcher.find_moves(
+                game.to_bytes(color), dice
+            )
+            if (legal_moves or move) and move not in legal_moves:
+                raise RequestError(f"illegal move {move}")
+
+            game.make_move(tuple(
+                (PIECES[color][position], step_len)
+                for position, step_len in move
+            ))
+            session.to_move = color.opposite
+
+        winner = game.winner
+        return {
+            "to_move": session.to_move.name,
+            "winner": winner.name if winner else None,
+        }
+
+
+class Client:
+    def __init__(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        self._reader = reader
+        self._writer = writer
+        self._request_ids = itertools.count()
+
+    @classmethod
+    async def connect(cls, host: str, port: int) -> "Client":
+        return cls(*await asyncio.open_connection(host, port))
+
+    async def request(self, op: str, **params) -> Dict[str, Any]:
+        # one request in flight per client, so the reply is the next line
+        request_id = next(self._request_ids)
+        message = {"id": request_id, "op": op, **params}
+        self._writer.write(json.dumps(message).encode() + b"\n")
+        reply = json.loads(await self._reader.readline())
+        assert reply["id"] == request_id
+        return reply
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(math.ceil(q / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+@dataclass
+class LoadReport:
+    latencies: List[float]
+    elapsed: float
+
+    @property
+    def p50(self) -> float:
+        return percentile(self.latencies, 50)
+
+    @property
+    def p99(self) -> float:
+        return percentile(self.latencies, 99)
+
+    @property
+    def requests_per_second(self) -> float:
+        return len(self.latencies) / self.elapsed if self.elapsed else 0.0
+
+
+async def _timed_request(
+    client: Client, latencies: List[float], op: str, **params
+) -> Dict[str, Any]:
+    started_at = time.perf_counter()
+    reply = await client.request(op, **params)
+    latencies.append(time.perf_counter() - started_at)
+    if "error" in reply:
+        raise RequestError(reply["error"])
+    return reply
+
+
+async def _play_client(
+    host: str, port: int, n_turns: int, seed: str, latencies: List[float]
+):
+    rng = random.Random(seed)
+    client = await Client.connect(host, port)
+    try:
+        session = (await client.request("new"))["session"]
+        for _ in range(n_turns):
+            dice = [rng.randint(1, 6), rng.randint(1, 6)]
+            reply = await _timed_request(
+                client, latencies, "moves", session=session, dice=dice
+            )
+            move = rng.choice(reply["moves"]) if reply["moves"] else []
+            reply = await _timed_request(
+                client, latencies, "play", session=session, dice=dice,
+                move=move,
+            )
+            if reply["winner"] is not None:
+                await client.request("close", session=session)
+                session = (await client.request("new"))["session"]
+    finally:
+        await client.close()
+
+
+async def run_load(
+    host: str, port: int, n_clients: int = 16, n_turns: int = 50, seed: int = 0
+) -> LoadReport:
+    latencies: List[float] = []
+    started_at = time.perf_counter()
+    await asyncio.gather(*(
+        _play_client(host, port, n_turns, f"{seed}-{client_num}", latencies)
+        for client_num in range(n_clients)
+    ))
+    return LoadReport(latencies, time.perf_counter() - started_at)
+
+
+async def _serve(args: argparse.Namespace):
+    server = GameServer(
+        workers=args.workers,
+        max_batch=args.max_batch,
+        max_delay=args.max_delay,
+    )
+    async with server:
+        host, port = await server.start(args.host, args.port)
+
+        if not args.load:
+            print(f"serving on {host}:{port}")
+            await asyncio.Event().wait()
+
+        report = await run_load(
+            host, port, args.clients, args.turns, args.seed
+        )
+        batcher = server.batcher
+        print(f"{len(report.latencies)} requests, "
+              f"{report.requests_per_second:.0f} requests/s")
+        print(f"p50 {report.p50 * 1000:.2f} ms, "
+              f"p99 {report.p99 * 1000:.2f} ms")
+        print(f"{batcher.n_requests / max(batcher.n_batches, 1):.1f} "
+              f"requests per batch")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the game server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH)
+    parser.add_argument("--max-delay", type=float, default=DEFAULT_MAX_DELAY)
+    parser.add_argument(
+        "--load", action="store_true",
+        help="run the synthetic load generator against the server and exit",
+    )
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    asyncio.run(_serve(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -15,7 +15,7 @@ class Color(Enum):
             return Color.LIGHT
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Piece:
     color: Color
     position: int
@@ -27,7 +27,7 @@ Step = Tuple[Piece, StepLen]
 Move = Tuple[Step, ...]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Cell:
     n_pieces: int = 0
     color: Optional[Color] = None
@@ -0,0 +1,109 @@
+import random
+from typing import List
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from batch import (  # noqa: E402
+    array_to_boards,
+    boards_to_array,
+    find_moves_batch,
+    illegal_prime_mask,
+    movable_mask,
+)
+from board import Board, NUM_CELLS, TOTAL_PIECES  # noqa: E402
+from game import Game  # noqa: E402
+from types_ import Cell, Color  # noqa: E402
+
+
+def random_position(rng: random.Random, home_only: bool = False) -> List[int]:
+    values = [0] * NUM_CELLS
+    for sign, home in ((1, range(18, 24)), (-1, range(6, 12))):
+        cells = home if home_only else range(NUM_CELLS)
+        for _ in range(rng.randint(1, TOTAL_PIECES)):
+            position = rng.choice([
+                i for i in cells if values[i] * sign >= 0
+            ])
+            values[position] += sign
+    return values
+
+
+@pytest.fixture
+def positions() -> np.ndarray:
+    rng = random.Random(7)
+    return np.vstack([
+        np.array([random_position(rng) for _ in range(40)], dtype=np.int8),
+        np.array(
+            [random_position(rng, home_only=True) for _ in range(20)],
+            dtype=np.int8,
+        ),
+        boards_to_array([
+            Board.from_dict({
+                0: Cell(2, Color.LIGHT),
+                **{cell: Cell(1, Color.LIGHT) for cell in range(2, 7)},
+                4: Cell(2, Color.LIGHT),
+                12: Cell(3, Color.DARK),
+                cell: Cell(1, Color.DARK),
+            })
+            for cell in (8, 13, 16)
+        ]),
+        boards_to_array([Board()]),
+    ])
+
+
+def test_board_array_round_trip(positions):
+    assert np.array_equal(boards_to_array(array_to_boards(positions)), positions)
+
+
+@pytest.mark.parametrize("color", list(Color))
+@pytest.mark.parametrize("step_len", [1, 4, 6])
+def test_movable_mask(positions, color, step_len):
+    mask = movable_mask(positions, color, step_len)
+
+    for board, board_mask in zip(array_to_boards(positions), mask):
+        expected = [
+            piece.position
+            for piece in board.find_movable_pieces(color, step_len)
+        ]
+        assert list(np.nonzero(board_mask)[0]) == expected
+
+
+@pytest.mark.parametrize("color", list(Color))
+@pytest.mark.parametrize("unique", [False, True])
+@pytest.mark.parametrize("dice", [(6, 5), (1, 2), (4, 3), (2, 2), (6, 6)])
+def test_find_moves_batch(positions, color, unique, dice):
+    result = find_moves_batch(positions, color, dice, unique=unique)
+
+    for board, moves, successors in zip(
+        array_to_boards(positions), result.moves, result.positions
+    ):
+        assert moves == Game(board).find_moves(color, dice, unique)
+        assert len(successors) == len(moves)
+
+        for move, successor in zip(moves, successors):
+            expected_board = Board.from_position_key(board.position_key())
+            for step in move:
+                expected_board.move_piece(*step)
+            assert successor.tobytes() == expected_board.position_key()
+
+
+@pytest.mark.parametrize("color", list(Color))
+def test_illegal_prime_mask(positions, color):
+    assert list(illegal_prime_mask(positions, color)) == [
+        board.has_illegal_prime(color) for board in array_to_boards(positions)
+    ]
+
+
+def test_illegal_prime_mask_detects_prime():
+    positions = boards_to_array([
+        Board.from_dict({
+            0: Cell(1, Color.LIGHT),
+            **{cell: Cell(1, Color.DARK) for cell in range(14, 20)},
+        }),
+        Board.from_dict({
+            20: Cell(1, Color.LIGHT),
+            **{cell: Cell(1, Color.DARK) for cell in range(14, 20)},
+        }),
+    ])
+    assert list(illegal_prime_mask(positions, Color.DARK)) == [True, False]
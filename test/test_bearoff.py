@@ -0,0 +1,114 @@
+import pytest
+
+from bearoff import (
+    BearoffDatabase,
+    BearoffError,
+    bearoff_evaluator,
+    iter_positions,
+    iter_steps,
+    n_positions,
+    position_index,
+)
+from board import Board
+from types_ import Cell, Color
+
+
+@pytest.fixture(scope="module")
+def database() -> BearoffDatabase:
+    return BearoffDatabase.generate(max_pieces=4)
+
+
+def test_position_index_is_dense():
+    indices = sorted(position_index(counts) for counts in iter_positions(4))
+    assert indices == list(range(n_positions(4)))
+    assert position_index((0,) * 6) == 0
+
+
+@pytest.mark.parametrize(
+    "counts, step_len, expected_steps",
+    [
+        pytest.param((0, 0, 1, 0, 0, 0), 1, [(0, 1, 0, 0, 0, 0)], id="move"),
+        pytest.param((0, 0, 1, 0, 0, 0), 3, [(0,) * 6], id="exact"),
+        pytest.param((1, 0, 1, 0, 0, 0), 5, [(1, 0, 0, 0, 0, 0)],
+                     id="rearmost only"),
+        pytest.param((1, 0, 0, 0, 1, 0), 2, [(1, 0, 1, 0, 0, 0)],
+                     id="no bear-off behind"),
+    ]
+)
+def test_iter_steps(counts, step_len, expected_steps):
+    assert list(iter_steps(counts, step_len)) == expected_steps
+
+
+@pytest.mark.parametrize(
+    "counts, expected_rolls",
+    [
+        pytest.param((0, 0, 0, 0, 0, 0), 0, id="empty"),
+        pytest.param((1, 0, 0, 0, 0, 0), 1, id="one piece"),
+        pytest.param((0, 0, 1, 0, 0, 0), 1, id="any roll"),
+        # only 2-1 leaves the piece on the board
+        pytest.param((0, 0, 0, 1, 0, 0), 1 + 2 / 36, id="all but 2-1"),
+        # only doubles bear off four pieces in one roll
+        pytest.param((4, 0, 0, 0, 0, 0), 2 - 6 / 36, id="four pieces"),
+    ]
+)
+def test_expected_rolls(database, counts, expected_rolls):
+    assert database.expected_rolls(counts) == pytest.approx(expected_rolls)
+
+
+def test_smaller_tables_are_prefixes(database):
+    smaller = BearoffDatabase.generate(max_pieces=2)
+    for counts in iter_positions(2):
+        assert smaller.expected_rolls(counts) == database.expected_rolls(counts)
+
+
+def test_save_and_load(database, tmp_path):
+    path = tmp_path / "bearoff.bin"
+    database.save(path)
+    loaded = BearoffDatabase.load(path)
+
+    assert loaded.max_pieces == 4
+    assert all(
+        loaded.expected_rolls(counts) == database.expected_rolls(counts)
+        for counts in iter_positions(4)
+    )
+
+    path.write_bytes(b"XXXX" + path.read_bytes()[4:])
+    with pytest.raises(BearoffError):
+        BearoffDatabase.load(path)
+
+
+def test_board_lookup(database):
+    board = Board.from_dict({
+        20: Cell(n_pieces=1, color=Color.LIGHT),
+        23: Cell(n_pieces=1, color=Color.LIGHT),
+        9: Cell(n_pieces=2, color=Color.DARK),
+        3: Cell(n_pieces=1, color=Color.DARK),
+    })
+
+    assert board.home_counts(Color.LIGHT) == (1, 0, 0, 1, 0, 0)
+    assert board.home_counts(Color.DARK) == (0, 0, 2, 0, 0, 0)
+    assert database.board_expected_rolls(board, Color.LIGHT) == (
+        database.expected_rolls((1, 0, 0, 1, 0, 0))
+    )
+
+    with pytest.raises(BearoffError):
+        database.board_expected_rolls(board, Color.DARK)
+
+    with pytest.raises(BearoffError):
+        database.expected_rolls((5, 0, 0, 0, 0, 0))
+
+
+def test_bearoff_evaluator(database):
+    board = Board.from_dict({
+        23: Cell(n_pieces=1, color=Color.LIGHT),
+        9: Cell(n_pieces=1, color=Color.DARK),
+        6: Cell(n_pieces=2, color=Color.DARK),
+    })
+    evaluate = bearoff_evaluator(database, fallback=lambda board, color: 0.5)
+
+    light_rolls = database.expected_rolls((1, 0, 0, 0, 0, 0))
+    dark_rolls = database.expected_rolls((0, 0, 1, 0, 0, 2))
+    assert evaluate(board, Color.LIGHT) == pytest.approx(
+        (dark_rolls - light_rolls) / (light_rolls + dark_rolls + 1)
+    )
+    assert evaluate(Board(), Color.LIGHT) == 0.5
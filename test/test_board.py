@@ -1,4 +1,6 @@
-from typing import Dict, List, Optional
+import copy
+import random
+from typing import Dict, List, Optional, Tuple
 
 import pytest
 
@@ -70,12 +72,65 @@ from types_ import Color, Piece
             ),
         ),
         pytest.param(
-            {22: Cell(n_pieces=1, color=Color.LIGHT)},
+            {
+                0: Cell(n_pieces=1, color=Color.LIGHT),
+                22: Cell(n_pieces=1, color=Color.LIGHT),
+            },
             22,
             3,
             False,
             id="move light piece over dark edge",
         ),
+        pytest.param(
+            {
+                10: Cell(n_pieces=1, color=Color.DARK),
+                12: Cell(n_pieces=1, color=Color.DARK),
+            },
+            10,
+            3,
+            False,
+            id="move dark piece over light edge",
+        ),
+        pytest.param(
+            {
+                20: Cell(n_pieces=1, color=Color.LIGHT),
+                22: Cell(n_pieces=1, color=Color.LIGHT),
+            },
+            22,
+            2,
+            True,
+            id="bear off light piece with exact step",
+        ),
+        pytest.param(
+            {
+                20: Cell(n_pieces=1, color=Color.LIGHT),
+                22: Cell(n_pieces=1, color=Color.LIGHT),
+            },
+            22,
+            3,
+            False,
+            id="bear off light piece with longer step, pieces behind",
+        ),
+        pytest.param(
+            {
+                20: Cell(n_pieces=1, color=Color.LIGHT),
+                22: Cell(n_pieces=1, color=Color.LIGHT),
+            },
+            20,
+            6,
+            True,
+            id="bear off rearmost light piece with longer step",
+        ),
+        pytest.param(
+            {
+                8: Cell(n_pieces=2, color=Color.DARK),
+                10: Cell(n_pieces=1, color=Color.DARK),
+            },
+            10,
+            2,
+            True,
+            id="bear off dark piece with exact step",
+        ),
     ]
 )
 def test_can_move_piece(
@@ -264,3 +319,323 @@ def test_get_top_piece(
     })
     piece = board.get_piece(position)
     assert piece == expected_piece
+
+
+def test_copy_is_independent():
+    board = Board.from_dict({0: Cell(n_pieces=2, color=Color.LIGHT)})
+    board_copy = copy.copy(board)
+    board_copy.move_piece(Piece(color=Color.LIGHT, position=0), 3)
+
+    assert board.get_cell(0) == Cell(n_pieces=2, color=Color.LIGHT)
+    assert board.get_cell(3) == Cell()
+    assert board_copy.get_cell(0) == Cell(n_pieces=1, color=Color.LIGHT)
+    assert board_copy.get_cell(3) == Cell(n_pieces=1, color=Color.LIGHT)
+
+
+@pytest.mark.parametrize(
+    "board_state, piece, move_length, expected_state",
+    [
+        pytest.param(
+            {0: Cell(n_pieces=1, color=Color.LIGHT)},
+            Piece(color=Color.LIGHT, position=0),
+            5,
+            {5: Cell(n_pieces=1, color=Color.LIGHT)},
+            id="light to a free cell",
+        ),
+        pytest.param(
+            {
+                12: Cell(n_pieces=3, color=Color.DARK),
+                14: Cell(n_pieces=1, color=Color.DARK),
+            },
+            Piece(color=Color.DARK, position=12),
+            2,
+            {
+                12: Cell(n_pieces=2, color=Color.DARK),
+                14: Cell(n_pieces=2, color=Color.DARK),
+            },
+            id="dark to a cell of the same color",
+        ),
+        pytest.param(
+            {22: Cell(n_pieces=1, color=Color.DARK)},
+            Piece(color=Color.DARK, position=22),
+            3,
+            {1: Cell(n_pieces=1, color=Color.DARK)},
+            id="dark over dark edge",
+        ),
+    ]
+)
+def test_move_piece(
+    board_state: Dict[int, Cell],
+    piece: Piece,
+    move_length: int,
+    expected_state: Dict[int, Cell],
+):
+    board = Board.from_dict(board_state)
+    board.move_piece(piece, move_length)
+    assert [board.get_cell(i) for i in range(24)] == [
+        expected_state.get(i, Cell()) for i in range(24)
+    ]
+
+
+def test_undo_step_restores_board():
+    board = Board.from_dict({
+        12: Cell(n_pieces=1, color=Color.DARK),
+        22: Cell(n_pieces=2, color=Color.DARK),
+    })
+    cells = [board.get_cell(i) for i in range(24)]
+
+    steps = [
+        (Piece(color=Color.DARK, position=22), 3),
+        (Piece(color=Color.DARK, position=1), 4),
+        (Piece(color=Color.DARK, position=12), 6),
+    ]
+    for step in steps:
+        board.apply_step(*step)
+    for step in reversed(steps):
+        board.undo_step(*step)
+
+    assert [board.get_cell(i) for i in range(24)] == cells
+
+
+def test_zobrist_key_is_updated_incrementally():
+    board = Board()
+    board.move_piece(Piece(color=Color.LIGHT, position=0), 6)
+    board.move_piece(Piece(color=Color.DARK, position=12), 5)
+
+    expected_board = Board.from_dict({
+        0: Cell(n_pieces=14, color=Color.LIGHT),
+        6: Cell(n_pieces=1, color=Color.LIGHT),
+        12: Cell(n_pieces=14, color=Color.DARK),
+        17: Cell(n_pieces=1, color=Color.DARK),
+    })
+
+    assert board == expected_board
+    assert board.zobrist_key == expected_board.zobrist_key
+    assert hash(board) == hash(expected_board)
+    assert board.zobrist_key != Board().zobrist_key
+
+
+def test_zobrist_key_is_restored_by_undo_step():
+    board = Board()
+    key = board.zobrist_key
+
+    board.apply_step(Piece(color=Color.LIGHT, position=0), 3)
+    assert board.zobrist_key != key
+
+    board.undo_step(Piece(color=Color.LIGHT, position=0), 3)
+    assert board.zobrist_key == key
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_movable_mask_matches_can_move_piece(seed: int):
+    rng = random.Random(seed)
+    board = Board.from_dict({
+        position: Cell(n_pieces=rng.randint(1, 3), color=rng.choice(list(Color)))
+        for position in rng.sample(range(24), 12)
+    })
+
+    for color in Color:
+        for move_length in range(1, 7):
+            assert board.find_movable_pieces(color, move_length) == [
+                piece
+                for piece in board.get_pieces(color)
+                if board.can_move_piece(piece, move_length)
+            ]
+
+
+def test_occupancy_masks_follow_moves():
+    board = Board()
+    board.move_piece(Piece(color=Color.DARK, position=12), 6)
+
+    assert board.occupancy_mask(Color.LIGHT) == 1 << 0
+    assert board.occupancy_mask(Color.DARK) == (1 << 12) | (1 << 18)
+
+    board.undo_step(Piece(color=Color.DARK, position=12), 6)
+
+    assert board.occupancy_mask(Color.DARK) == 1 << 12
+
+
+def test_features():
+    board = Board.from_dict({
+        0: Cell(n_pieces=3, color=Color.LIGHT),
+        19: Cell(n_pieces=1, color=Color.LIGHT),
+        20: Cell(n_pieces=1, color=Color.DARK),
+        7: Cell(n_pieces=2, color=Color.DARK),
+    })
+
+    # pip count, pieces on board, pieces home, blots, points
+    assert board.features(Color.LIGHT) == (3 * 24 + 5, 4, 1, 1, 2)
+    assert board.features(Color.DARK) == (16 + 2 * 5, 3, 2, 1, 2)
+    assert board.pip_count(Color.LIGHT) == 3 * 24 + 5
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_features_are_updated_incrementally(seed: int):
+    rng = random.Random(seed)
+    board = Board()
+
+    for _ in range(60):
+        color = rng.choice(list(Color))
+        move_length = rng.randint(1, 6)
+        pieces = board.find_movable_pieces(color, move_length)
+        if pieces:
+            board.move_piece(rng.choice(pieces), move_length)
+
+        rebuilt_board = Board.from_position_key(board.position_key())
+        for color in Color:
+            assert board.features(color) == rebuilt_board.features(color)
+            assert board.is_home(color) == rebuilt_board.is_home(color)
+            assert board.longest_block(color) == max(
+                (length for _, length in board.blocks(color)), default=0
+            )
+            assert (
+                board.longest_block(color)
+                == rebuilt_board.longest_block(color)
+            )
+
+
+@pytest.mark.parametrize(
+    "board_state, color, expected_blocks, expected_illegal_prime",
+    [
+        pytest.param(
+            {
+                2: Cell(n_pieces=1, color=Color.LIGHT),
+                3: Cell(n_pieces=2, color=Color.LIGHT),
+                5: Cell(n_pieces=1, color=Color.LIGHT),
+            },
+            Color.LIGHT,
+            [(5, 1), (2, 2)],
+            False,
+            id="short light blocks",
+        ),
+        pytest.param(
+            {
+                10: Cell(n_pieces=1, color=Color.LIGHT),
+                11: Cell(n_pieces=1, color=Color.LIGHT),
+                12: Cell(n_pieces=1, color=Color.LIGHT),
+                13: Cell(n_pieces=1, color=Color.LIGHT),
+            },
+            Color.LIGHT,
+            [(12, 2), (10, 2)],
+            False,
+            id="light block split by the end of dark route",
+        ),
+        pytest.param(
+            {
+                21: Cell(n_pieces=1, color=Color.DARK),
+                22: Cell(n_pieces=1, color=Color.DARK),
+                23: Cell(n_pieces=1, color=Color.DARK),
+                0: Cell(n_pieces=1, color=Color.DARK),
+                1: Cell(n_pieces=1, color=Color.DARK),
+                2: Cell(n_pieces=1, color=Color.DARK),
+            },
+            Color.DARK,
+            [(0, 3), (21, 3)],
+            False,
+            id="dark block split by the end of light route",
+        ),
+        pytest.param(
+            {
+                0: Cell(n_pieces=1, color=Color.LIGHT),
+                14: Cell(n_pieces=1, color=Color.DARK),
+                15: Cell(n_pieces=1, color=Color.DARK),
+                16: Cell(n_pieces=1, color=Color.DARK),
+                17: Cell(n_pieces=1, color=Color.DARK),
+                18: Cell(n_pieces=1, color=Color.DARK),
+                19: Cell(n_pieces=1, color=Color.DARK),
+            },
+            Color.DARK,
+            [(14, 6)],
+            True,
+            id="dark prime with light piece behind",
+        ),
+        pytest.param(
+            {
+                14: Cell(n_pieces=1, color=Color.DARK),
+                15: Cell(n_pieces=1, color=Color.DARK),
+                16: Cell(n_pieces=1, color=Color.DARK),
+                17: Cell(n_pieces=1, color=Color.DARK),
+                18: Cell(n_pieces=1, color=Color.DARK),
+                19: Cell(n_pieces=1, color=Color.DARK),
+                20: Cell(n_pieces=1, color=Color.LIGHT),
+            },
+            Color.DARK,
+            [(14, 6)],
+            False,
+            id="dark prime with light piece ahead",
+        ),
+    ]
+)
+def test_blocks(
+    board_state: Dict[int, Cell],
+    color: Color,
+    expected_blocks: List[Tuple[int, int]],
+    expected_illegal_prime: bool,
+):
+    board = Board.from_dict(board_state)
+    assert sorted(board.blocks(color)) == sorted(expected_blocks)
+    assert board.longest_block(color) == max(
+        length for _, length in expected_blocks
+    )
+    assert board.has_illegal_prime(color) == expected_illegal_prime
+
+
+def test_pieces_and_cells_are_shared_values():
+    board = Board()
+    piece = board.get_piece(0)
+
+    assert piece is board.get_last_piece(Color.LIGHT)
+    assert piece is next(iter(board.find_movable_pieces(Color.LIGHT, 1)))
+    assert piece == Piece(color=Color.LIGHT, position=0)
+    assert board.get_cell(12) is board.get_cell(12)
+    assert board.get_cell(12) == Cell(n_pieces=15, color=Color.DARK)
+
+    move = ((piece, 3), (piece, 4))
+    assert {move: 1}[((Piece(Color.LIGHT, 0), 3), (Piece(Color.LIGHT, 0), 4))]
+
+    with pytest.raises(AttributeError):
+        piece.position = 1
+    assert not hasattr(piece, "__dict__")
+
+
+@pytest.mark.parametrize(
+    "board_state, expected_result",
+    [
+        pytest.param({}, False, id="empty board"),
+        pytest.param(
+            {20: Cell(3, Color.LIGHT), 5: Cell(2, Color.DARK)},
+            True,
+            id="both colors home",
+        ),
+        pytest.param(
+            {14: Cell(3, Color.LIGHT), 2: Cell(2, Color.DARK)},
+            True,
+            id="passed each other",
+        ),
+        pytest.param(
+            {14: Cell(3, Color.LIGHT), 16: Cell(2, Color.DARK)},
+            False,
+            id="dark ahead of light",
+        ),
+        pytest.param(
+            {2: Cell(3, Color.LIGHT), 20: Cell(2, Color.DARK)},
+            False,
+            id="light ahead of dark",
+        ),
+        pytest.param({20: Cell(3, Color.LIGHT)}, False, id="one color"),
+    ]
+)
+def test_is_non_contact(board_state: Dict[int, Cell], expected_result: bool):
+    board = Board.from_dict(board_state)
+    assert board.is_non_contact() == expected_result
+
+
+def test_route_counts():
+    board = Board.from_dict({
+        20: Cell(3, Color.LIGHT),
+        5: Cell(2, Color.DARK),
+        13: Cell(1, Color.DARK),
+    })
+
+    assert board.route_counts(Color.LIGHT) == [0] * 20 + [3, 0, 0, 0]
+    assert board.route_counts(Color.DARK) == [0, 1] + [0] * 15 + [2] + [0] * 6
@@ -0,0 +1,130 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from board import Board, Cell  # noqa: E402
+import dataset  # noqa: E402
+from dataset import (  # noqa: E402
+    DatasetError,
+    DatasetReader,
+    DatasetWriter,
+)
+from game import Game  # noqa: E402
+from types_ import Color  # noqa: E402
+
+
+def records(n: int):
+    for i in range(n):
+        game = Game(
+            Board.from_dict({
+                i % 24: Cell(n_pieces=3, color=Color.LIGHT),
+                (i + 5) % 24: Cell(n_pieces=2, color=Color.DARK),
+            }),
+            light_born_off_num=12,
+            dark_born_off_num=13,
+        )
+        yield game, Color.LIGHT if i % 2 else Color.DARK, i / 10
+
+
+def test_write_and_read(tmp_path):
+    path = str(tmp_path / "positions.bin")
+
+    with DatasetWriter(path) as writer:
+        writer.append(records(5))
+        writer.append(list(records(10))[5:])
+        assert len(writer) == 10
+
+    with DatasetReader(path) as reader:
+        assert len(reader) == 10
+        assert reader.cells.shape == (10, 24)
+        assert reader.cells[3, 3] == 3
+        assert reader.cells[3, 8] == -2
+        assert np.allclose(reader.values, [i / 10 for i in range(10)])
+
+        for i, (game, to_move, value) in enumerate(records(10)):
+            read_game, read_to_move, read_value = reader.get(i)
+            assert read_game.board == game.board
+            assert read_game.born_off_num(Color.DARK) == 13
+            assert read_to_move == to_move
+            assert read_value == pytest.approx(value)
+
+
+def test_views_are_zero_copy(tmp_path):
+    path = str(tmp_path / "positions.bin")
+    with DatasetWriter(path) as writer:
+        writer.append(records(4))
+
+    with DatasetReader(path) as reader:
+        assert not reader.cells.flags.owndata
+        assert not reader.cells.flags.writeable
+
+
+def test_append_to_existing_file(tmp_path):
+    path = str(tmp_path / "positions.bin")
+    with DatasetWriter(path) as writer:
+        writer.append(records(3))
+    with DatasetWriter(path) as writer:
+        writer.append(records(2))
+
+    with DatasetReader(path) as reader:
+        assert len(reader) == 5
+        assert reader.cells[4, 1] == 3
+
+
+def test_batches(tmp_path):
+    path = str(tmp_path / "positions.bin")
+    with DatasetWriter(path) as writer:
+        writer.append(records(10))
+
+    with DatasetReader(path) as reader:
+        batches = list(reader.iter_batches(4))
+        assert [len(batch) for batch in batches] == [4, 4, 2]
+
+        shuffled = list(reader.iter_batches(4, shuffle=True, seed=1))
+        assert sorted(
+            value for batch in shuffled for value in batch["value"]
+        ) == sorted(reader.values)
+
+        assert list(reader.batch(np.array([7, 2]))["value"]) == [
+            reader.values[7], reader.values[2]
+        ]
+
+
+def test_empty_dataset(tmp_path):
+    path = str(tmp_path / "positions.bin")
+    DatasetWriter(path).close()
+
+    with DatasetReader(path) as reader:
+        assert len(reader) == 0
+
+
+def test_not_a_dataset(tmp_path):
+    path = tmp_path / "positions.bin"
+    path.write_bytes(b"x" * 64)
+
+    with pytest.raises(DatasetError):
+        DatasetReader(str(path))
+
+
+@pytest.mark.parametrize("dataset_class", [DatasetReader, DatasetWriter])
+@pytest.mark.parametrize(
+    "size", [8, 16 + 31 * 3 + 10], ids=["header", "records"]
+)
+def test_truncated_dataset(tmp_path, monkeypatch, dataset_class, size: int):
+    path = str(tmp_path / "positions.bin")
+    with DatasetWriter(path) as writer:
+        writer.append(records(5))
+    with open(path, "r+b") as dataset_file:
+        dataset_file.truncate(size)
+
+    opened_files = []
+
+    def recording_open(*args, **kwargs):
+        opened_files.append(open(*args, **kwargs))
+        return opened_files[-1]
+
+    monkeypatch.setattr(dataset, "open", recording_open, raising=False)
+    with pytest.raises(DatasetError):
+        dataset_class(path)
+
+    assert opened_files and all(f.closed for f in opened_files)
@@ -0,0 +1,114 @@
+import pickle
+
+import pytest
+
+from board import Board, Cell
+from encoding import (
+    MOVE_SIZE,
+    POSITION_SIZE,
+    decode_move,
+    decode_moves,
+    decode_positions,
+    encode_move,
+    encode_moves,
+    encode_positions,
+)
+from game import Game
+from types_ import Color, Piece
+
+
+def midgame() -> Game:
+    return Game(
+        Board.from_dict({
+            3: Cell(n_pieces=2, color=Color.LIGHT),
+            12: Cell(n_pieces=7, color=Color.DARK),
+            20: Cell(n_pieces=5, color=Color.LIGHT),
+        }),
+        light_born_off_num=8,
+        dark_born_off_num=0,
+    )
+
+
+def test_board_round_trip():
+    board = midgame().board
+    decoded_board = Board.from_bytes(board.to_bytes())
+
+    assert len(board.to_bytes()) == 24
+    assert decoded_board == board
+    assert decoded_board.zobrist_key == board.zobrist_key
+
+
+def test_game_round_trip():
+    game = midgame()
+    data = game.to_bytes(Color.DARK)
+    decoded_game, to_move = Game.from_bytes(data)
+
+    assert len(data) == POSITION_SIZE
+    assert to_move == Color.DARK
+    assert decoded_game.board == game.board
+    assert decoded_game.born_off_num(Color.LIGHT) == 8
+    assert decoded_game.zobrist_key(Color.DARK) == game.zobrist_key(Color.DARK)
+
+
+def test_move_round_trip():
+    for move in Game(Board()).find_moves(Color.DARK, (4, 4)) + [()]:
+        data = encode_move(move)
+        assert len(data) == MOVE_SIZE
+        assert decode_move(data, Color.DARK) == move
+
+
+def test_bulk_round_trip():
+    positions = [(midgame(), Color.LIGHT), (Game(Board()), Color.DARK)]
+    decoded = decode_positions(encode_positions(positions))
+
+    assert [
+        (game.board, to_move) for game, to_move in decoded
+    ] == [(game.board, to_move) for game, to_move in positions]
+
+    moves = Game(Board()).find_moves(Color.LIGHT, (6, 5))
+    assert decode_moves(encode_moves(moves), Color.LIGHT) == moves
+
+
+def test_encoding_is_smaller_than_pickle():
+    move = ((Piece(color=Color.LIGHT, position=0), 6),) * 2
+    assert len(encode_move(move)) * 10 < len(pickle.dumps(move))
+    assert POSITION_SIZE * 10 < len(pickle.dumps(midgame().board))
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        pytest.param(bytes(23), id="short"),
+        pytest.param(bytes([100] + [0] * 23), id="cell over 15 pieces"),
+        pytest.param(bytes([10, 10] + [0] * 22), id="over 15 light pieces"),
+        pytest.param(bytes([0xF6, 0xF6] + [0] * 22), id="over 15 dark pieces"),
+    ]
+)
+def test_invalid_board_bytes(data: bytes):
+    with pytest.raises(ValueError):
+        Board.from_bytes(data)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        pytest.param(bytes(POSITION_SIZE - 1), id="short"),
+        pytest.param(bytes([5] + [0] * 23 + [11, 0, 1]),
+                     id="over 15 light pieces with born-off"),
+        pytest.param(bytes([0xFB] + [0] * 23 + [0, 11, 1]),
+                     id="over 15 dark pieces with born-off"),
+        pytest.param(bytes(24) + bytes([0, 0, 3]), id="unknown color"),
+    ]
+)
+def test_invalid_game_bytes(data: bytes):
+    with pytest.raises(ValueError):
+        Game.from_bytes(data)
+
+
+def test_invalid_bulk_data():
+    with pytest.raises(ValueError):
+        decode_positions(bytes(POSITION_SIZE + 1))
+    with pytest.raises(ValueError):
+        decode_moves(bytes(MOVE_SIZE + 1), Color.LIGHT)
+    with pytest.raises(ValueError):
+        decode_move(bytes([144, 0xFF, 0xFF, 0xFF]), Color.LIGHT)
@@ -1,4 +1,6 @@
-from typing import Tuple, List
+import copy
+import random
+from typing import Dict, Tuple, List
 
 import pytest
 
@@ -338,3 +340,358 @@ def test_is_home(
     game = Game(board)
     result = game.is_home(color)
     assert result == expected_result
+
+
+def test_find_moves_leaves_board_untouched():
+    board = Board()
+    cells = [board.get_cell(i) for i in range(24)]
+
+    Game(board).find_moves(Color.LIGHT, (6, 5))
+
+    assert [board.get_cell(i) for i in range(24)] == cells
+
+
+@pytest.mark.parametrize(
+    "board, color, dice, expected_moves",
+    [
+        pytest.param(
+            Board.from_dict({0: Cell(1, Color.LIGHT)}),
+            Color.LIGHT,
+            (5, 3),
+            [
+                (
+                    (Piece(color=Color.LIGHT, position=0), 5),
+                    (Piece(color=Color.LIGHT, position=5), 3),
+                ),
+            ],
+            id="one piece, both orders reach the same cell"
+        ),
+        pytest.param(
+            Board.from_dict({1: Cell(2, Color.LIGHT)}),
+            Color.LIGHT,
+            (5, 3),
+            [
+                (
+                    (Piece(color=Color.LIGHT, position=1), 5),
+                    (Piece(color=Color.LIGHT, position=6), 3),
+                ),
+                (
+                    (Piece(color=Color.LIGHT, position=1), 5),
+                    (Piece(color=Color.LIGHT, position=1), 3),
+                ),
+            ],
+            id="two pieces"
+        ),
+        pytest.param(
+            Board.from_dict({
+                0: Cell(1, Color.LIGHT),
+                3: Cell(1, Color.DARK),
+                5: Cell(1, Color.DARK),
+            }),
+            Color.LIGHT,
+            (5, 3),
+            [],
+            id="no moves",
+        ),
+    ]
+)
+def test_find_unique_moves(
+    board: Board,
+    color: Color,
+    dice: Tuple[int, int],
+    expected_moves: List[Move]
+):
+    game = Game(board)
+    actual_moves = [
+        tuple((piece.position, step_len) for piece, step_len in move)
+        for move in game.find_moves(color, dice, unique=True)
+    ]
+    expected_moves = [
+        tuple((piece.position, step_len) for piece, step_len in move)
+        for move in expected_moves
+    ]
+    assert sorted(actual_moves) == sorted(expected_moves)
+
+
+def test_find_unique_moves_covers_all_positions():
+    def resulting_position(move: Move) -> bytes:
+        board = copy.copy(game_board)
+        for step in move:
+            board.move_piece(*step)
+        return board.position_key()
+
+    game_board = Board()
+    game = Game(game_board)
+
+    all_positions = [
+        resulting_position(move)
+        for move in game.find_moves(Color.LIGHT, (6, 5))
+    ]
+    unique_positions = [
+        resulting_position(move)
+        for move in game.find_moves(Color.LIGHT, (6, 5), unique=True)
+    ]
+
+    assert len(unique_positions) == len(set(unique_positions))
+    assert set(unique_positions) == set(all_positions)
+
+
+def test_zobrist_key_depends_on_side_to_move():
+    game = Game(Board())
+    assert game.zobrist_key(Color.LIGHT) != game.zobrist_key(Color.DARK)
+    assert game.zobrist_key(Color.LIGHT) == Game(Board()).zobrist_key(
+        Color.LIGHT
+    )
+
+
+def test_make_move():
+    board = Board()
+    game = Game(board)
+    move = game.find_moves(Color.LIGHT, (3, 1))[0]
+
+    game.make_move(move)
+
+    assert board != Board()
+
+
+@pytest.mark.parametrize("unique", [False, True])
+@pytest.mark.parametrize("dice", [(6, 5), (3, 1), (4, 4)])
+def test_iter_moves_matches_find_moves(unique: bool, dice: Tuple[int, int]):
+    board = Board.from_dict({
+        0: Cell(10, Color.LIGHT),
+        4: Cell(2, Color.LIGHT),
+        7: Cell(3, Color.LIGHT),
+        9: Cell(1, Color.DARK),
+        12: Cell(14, Color.DARK),
+    })
+    game = Game(board)
+
+    assert list(game.iter_moves(Color.LIGHT, dice, unique)) == (
+        game._search_moves(Color.LIGHT, dice, unique)
+    )
+
+
+def test_iter_moves_restores_board_when_closed():
+    board = Board()
+    game = Game(board)
+
+    moves = game.iter_moves(Color.LIGHT, (6, 5))
+    next(moves)
+    assert board != Board()
+
+    moves.close()
+    assert board == Board()
+
+
+def test_find_moves_doubles_one_piece():
+    game = Game(Board.from_dict({3: Cell(1, Color.LIGHT)}))
+    actual_moves = [
+        tuple((piece.position, step_len) for piece, step_len in move)
+        for move in game.find_moves(Color.LIGHT, (2, 2))
+    ]
+    assert actual_moves == [((3, 2), (5, 2), (7, 2), (9, 2))]
+
+
+def _naive_final_positions(board: Board, color: Color, seq, head_moved=False):
+    positions = set()
+    for piece in board.find_movable_pieces(color, seq[0]) if seq else []:
+        is_head_move = Game.is_head_piece(piece)
+        if head_moved and is_head_move:
+            continue
+        next_board = copy.copy(board)
+        next_board.move_piece(piece, seq[0])
+        positions |= {
+            (depth + 1, position)
+            for depth, position in _naive_final_positions(
+                next_board, color, seq[1:], head_moved or is_head_move
+            )
+        }
+    return positions or {(0, board.position_key())}
+
+
+@pytest.mark.parametrize(
+    "board_state",
+    [
+        pytest.param(
+            {
+                0: Cell(3, Color.LIGHT),
+                3: Cell(2, Color.LIGHT),
+                7: Cell(1, Color.DARK),
+                12: Cell(4, Color.DARK),
+                15: Cell(1, Color.LIGHT),
+                16: Cell(2, Color.DARK),
+            },
+            id="midgame",
+        ),
+        pytest.param(
+            {
+                6: Cell(2, Color.DARK),
+                9: Cell(1, Color.DARK),
+                11: Cell(3, Color.DARK),
+                14: Cell(1, Color.LIGHT),
+                18: Cell(2, Color.LIGHT),
+                21: Cell(1, Color.LIGHT),
+                23: Cell(2, Color.LIGHT),
+            },
+            id="bear-off",
+        ),
+    ]
+)
+@pytest.mark.parametrize("dice", [(1, 1), (3, 3), (6, 6)])
+@pytest.mark.parametrize("color", list(Color))
+def test_find_moves_doubles_reach_every_position(
+    board_state: Dict[int, Cell], dice: Tuple[int, int], color: Color
+):
+    board = Board.from_dict(board_state)
+
+    naive_positions = _naive_final_positions(board, color, (dice[0],) * 4)
+    max_move_len = max(depth for depth, _ in naive_positions)
+
+    def resulting_position(move: Move) -> bytes:
+        result = copy.copy(board)
+        for step in move:
+            result.move_piece(*step)
+        return result.position_key()
+
+    moves = Game(board).find_moves(color, dice)
+    assert all(len(move) == max_move_len for move in moves)
+    assert {resulting_position(move) for move in moves} == {
+        position
+        for depth, position in naive_positions
+        if depth == max_move_len and depth > 0
+    }
+
+
+@pytest.mark.parametrize(
+    "board, color, dice, expected_moves",
+    [
+        pytest.param(
+            Board.from_dict({
+                20: Cell(1, Color.LIGHT),
+                22: Cell(1, Color.LIGHT),
+            }),
+            Color.LIGHT,
+            (4, 2),
+            [
+                ((20, 4), (22, 2)),
+                ((20, 2), (22, 4)),
+                ((22, 2), (20, 4)),
+            ],
+            id="light bears off",
+        ),
+        pytest.param(
+            Board.from_dict({
+                5: Cell(1, Color.DARK),
+                10: Cell(1, Color.DARK),
+            }),
+            Color.DARK,
+            (2, 1),
+            [
+                ((5, 2), (7, 1)),
+                ((5, 2), (10, 1)),
+                ((5, 1), (6, 2)),
+                ((5, 1), (10, 2)),
+                ((10, 1), (5, 2)),
+            ],
+            id="dark comes home and bears off",
+        ),
+        pytest.param(
+            Board.from_dict({
+                11: Cell(1, Color.DARK),
+                17: Cell(1, Color.DARK),
+            }),
+            Color.DARK,
+            (5, 1),
+            [
+                ((17, 5), (22, 1)),
+                ((17, 1), (18, 5)),
+            ],
+            id="dark can't bear off before coming home",
+        ),
+    ]
+)
+def test_find_moves_bear_off(
+    board: Board,
+    color: Color,
+    dice: Tuple[int, int],
+    expected_moves: List[Tuple[Tuple[int, int], ...]],
+):
+    actual_moves = [
+        tuple((piece.position, step_len) for piece, step_len in move)
+        for move in Game(board).find_moves(color, dice)
+    ]
+    assert sorted(actual_moves) == sorted(expected_moves)
+
+
+def test_make_move_counts_born_off_pieces():
+    board = Board.from_dict({23: Cell(1, Color.LIGHT)})
+    game = Game(board)
+    game.make_move(((Piece(color=Color.LIGHT, position=23), 1),))
+
+    assert game.born_off_num(Color.LIGHT) == 1
+    assert board.get_last_piece(Color.LIGHT) is None
+
+
+@pytest.mark.parametrize(
+    "dark_position, is_prime_allowed",
+    [
+        pytest.param(12, False, id="no dark piece ahead of the prime"),
+        pytest.param(8, True, id="dark piece ahead of the prime"),
+    ]
+)
+def test_find_moves_prime_rule(dark_position: int, is_prime_allowed: bool):
+    board = Board.from_dict({
+        0: Cell(2, Color.LIGHT),
+        2: Cell(1, Color.LIGHT),
+        3: Cell(1, Color.LIGHT),
+        4: Cell(2, Color.LIGHT),
+        5: Cell(1, Color.LIGHT),
+        6: Cell(1, Color.LIGHT),
+        dark_position: Cell(3, Color.DARK),
+    })
+    moves = [
+        tuple((piece.position, step_len) for piece, step_len in move)
+        for move in Game(board).find_moves(Color.LIGHT, (3, 1))
+    ]
+
+    assert (((0, 1), (4, 3)) in moves) == is_prime_allowed
+    assert (((4, 3), (0, 1)) in moves) == is_prime_allowed
+    assert ((0, 1), (2, 3)) in moves
+
+
+def _random_race_board(rng: random.Random) -> Board:
+    # LIGHT pieces on cells 12-23 have passed DARK pieces on cells 0-11
+    light_last = rng.randint(12, 23)
+    dark_last = rng.randint(0, 11)
+    cells: Dict[int, Cell] = {}
+
+    for color, first, last in [
+        (Color.LIGHT, light_last, 23), (Color.DARK, dark_last, 11)
+    ]:
+        for _ in range(rng.randint(1, 15)):
+            position = rng.randint(first, last)
+            n_pieces = cells.get(position, Cell(0, color)).n_pieces
+            cells[position] = Cell(n_pieces + 1, color)
+
+    return Board.from_dict(cells)
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("unique", [False, True])
+def test_race_moves_match_general_search(
+    monkeypatch, seed: int, unique: bool
+):
+    rng = random.Random(seed)
+    board = _random_race_board(rng)
+    assert board.is_non_contact()
+
+    game = Game(board)
+    race_moves = {
+        (color, dice): game.find_moves(color, dice, unique)
+        for color in Color
+        for dice in [(6, 6), (5, 2), (3, 3), (2, 1), (1, 1)]
+    }
+
+    monkeypatch.setattr(board, "is_non_contact", lambda: False)
+    for (color, dice), moves in race_moves.items():
+        assert moves == game.find_moves(color, dice, unique)
@@ -0,0 +1,100 @@
+import copy
+
+import pytest
+
+from board import Board
+from game import Game
+from instrumentation import CALL, Instrumentation
+from types_ import Cell, Color, Piece
+
+
+def play_opening(game: Game):
+    game.make_move(game.find_moves(Color.LIGHT, (6, 5))[0])
+    return game.find_moves(Color.DARK, (3, 2))
+
+
+def test_methods_are_restored():
+    originals = dict(Board.__dict__), dict(Game.__dict__)
+
+    with Instrumentation():
+        assert Board.__dict__["move_piece"] is not originals[0]["move_piece"]
+
+    assert dict(Board.__dict__) == originals[0]
+    assert dict(Game.__dict__) == originals[1]
+
+
+def test_results_are_unchanged():
+    expected_moves = play_opening(Game(Board()))
+
+    with Instrumentation():
+        assert play_opening(Game(Board())) == expected_moves
+
+
+def test_counters():
+    board = Board()
+
+    with Instrumentation() as instrumentation:
+        game = Game(board)
+        moves = play_opening(game)
+        copy.copy(board)
+        board.move_piece(Piece(color=Color.LIGHT, position=0), 1)
+
+    stats = instrumentation.stats
+    assert stats["Game.find_moves"].calls == 2
+    assert stats["Game.find_moves"].max_items >= len(moves)
+    assert stats["Board.__copy__"].calls == 1
+    assert stats["Board.move_piece"].calls == 3
+    assert stats["Board.find_movable_pieces"].calls > 0
+    assert stats["Game._search_moves"].items == (
+        stats["Game._iter_step_sequences"].calls
+    )
+
+    counters = instrumentation.export()
+    assert counters["Board.move_piece.calls"] == 3
+    assert counters["Game.find_moves.total_time"] > 0
+    assert "Board.move_piece" in instrumentation.report()
+
+    instrumentation.reset()
+    assert all(stats.calls == 0 for stats in instrumentation.stats.values())
+
+
+def test_nested_instrumentation_is_rejected():
+    with Instrumentation():
+        with pytest.raises(RuntimeError):
+            with Instrumentation():
+                pass
+
+    with Instrumentation():
+        pass
+
+
+def test_race_search_nodes_are_counted():
+    board = Board.from_dict({
+        20: Cell(3, Color.LIGHT),
+        22: Cell(2, Color.LIGHT),
+        5: Cell(2, Color.DARK),
+    })
+    assert board.is_non_contact()
+
+    with Instrumentation() as instrumentation:
+        moves = Game(board).find_moves(Color.LIGHT, (3, 1))
+
+    stats = instrumentation.stats
+    race_nodes = stats["Game._iter_race_step_sequences"]
+    assert moves
+    assert race_nodes.calls > 0
+    assert stats["Game._iter_step_sequences"].calls == 0
+    assert stats["Game._search_moves"].items == race_nodes.calls
+
+
+def test_bad_target_restores_patched_methods():
+    originals = dict(Board.__dict__)
+    targets = [(Board, "move_piece", CALL), (Board, "no_such_method", CALL)]
+
+    with pytest.raises(KeyError):
+        with Instrumentation(targets):
+            pass
+
+    assert dict(Board.__dict__) == originals
+    with Instrumentation():
+        pass
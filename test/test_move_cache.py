@@ -0,0 +1,45 @@
+from game import Game
+from board import Board
+from move_cache import MoveCache
+from types_ import Color, Piece
+
+
+def test_lru_eviction():
+    cache = MoveCache(maxsize=2)
+    cache.put("a", ())
+    cache.put("b", ())
+    assert cache.get("a") == ()
+
+    cache.put("c", ())
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == ()
+    assert cache.get("c") == ()
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_game_uses_cache():
+    cache = MoveCache()
+    board = Board()
+
+    first_moves = Game(board, move_cache=cache).find_moves(Color.LIGHT, (6, 5))
+    second_moves = Game(board, move_cache=cache).find_moves(Color.LIGHT, (6, 5))
+
+    assert isinstance(first_moves, tuple)
+    assert second_moves is first_moves
+    assert list(first_moves) == Game(board).find_moves(Color.LIGHT, (6, 5))
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_key_follows_position():
+    cache = MoveCache()
+    board = Board()
+    game = Game(board, move_cache=cache)
+
+    opening_moves = game.find_moves(Color.LIGHT, (6, 5))
+    board.move_piece(Piece(color=Color.LIGHT, position=0), 6)
+    moves = game.find_moves(Color.LIGHT, (6, 5))
+
+    assert moves != opening_moves
+    assert (cache.hits, cache.misses) == (0, 2)
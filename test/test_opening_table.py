@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+import opening_table
+from board import Board
+from game import Game
+from opening_table import (
+    OPENING_TABLE_PATH,
+    OPENING_TABLE_VERSION,
+    ROLLS,
+    generate_opening_table,
+)
+from types_ import Color
+
+
+def test_table_matches_generator():
+    with open(OPENING_TABLE_PATH) as table_file:
+        stored_table = json.load(table_file)
+
+    assert stored_table["version"] == OPENING_TABLE_VERSION
+    assert stored_table == generate_opening_table(), (
+        "opening table is stale, regenerate it with "
+        "`python src/opening_table.py`"
+    )
+
+
+def test_rolls():
+    assert len(ROLLS) == 21
+    assert len(set(ROLLS)) == 21
+
+
+@pytest.mark.parametrize("color", list(Color))
+@pytest.mark.parametrize("unique", [False, True])
+@pytest.mark.parametrize("dice", [(6, 5), (2, 4), (3, 3)])
+def test_find_moves_uses_table(monkeypatch, color, unique, dice):
+    game = Game(Board())
+    searched_moves = game._search_moves(
+        color, tuple(sorted(dice, reverse=True)), unique
+    )
+
+    def fail(*args):
+        raise AssertionError("opening position was searched")
+
+    monkeypatch.setattr(game, "_search_moves", fail)
+    moves = game.find_moves(color, dice, unique)
+
+    assert moves == searched_moves
+
+
+def test_stale_table_is_ignored(tmp_path):
+    path = tmp_path / "opening_moves.json"
+    path.write_text(json.dumps({"version": OPENING_TABLE_VERSION - 1}))
+
+    assert opening_table._load_opening_table(str(path)) is None
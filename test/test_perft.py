@@ -0,0 +1,42 @@
+import pytest
+
+from board import Board, Cell
+from perft import perft
+from types_ import Color
+
+
+@pytest.mark.parametrize(
+    "depth, expected_nodes",
+    [
+        pytest.param(0, 1, id="root"),
+        # one head piece may move per turn: 2 orders for each of the 15
+        # distinct non-doubles and 1 move for each of the 6 doubles
+        pytest.param(1, 36, id="one ply"),
+        pytest.param(2, 36 * 36, id="two plies"),
+    ]
+)
+def test_perft_opening(depth: int, expected_nodes: int):
+    assert perft(Board(), Color.LIGHT, depth).nodes == expected_nodes
+
+
+def midgame_board() -> Board:
+    return Board.from_dict({
+        0: Cell(n_pieces=3, color=Color.LIGHT),
+        4: Cell(n_pieces=1, color=Color.LIGHT),
+        9: Cell(n_pieces=1, color=Color.DARK),
+        12: Cell(n_pieces=3, color=Color.DARK),
+        20: Cell(n_pieces=1, color=Color.DARK),
+    })
+
+
+def test_perft_modes_agree():
+    nodes = perft(midgame_board(), Color.LIGHT, 2).nodes
+
+    assert perft(midgame_board(), Color.LIGHT, 2, use_table=True).nodes == nodes
+    assert perft(midgame_board(), Color.LIGHT, 2, workers=2).nodes == nodes
+
+
+def test_perft_restores_board():
+    board = midgame_board()
+    perft(board, Color.DARK, 2, use_table=True)
+    assert board == midgame_board()
@@ -0,0 +1,123 @@
+import io
+import random
+
+import pytest
+
+from board import Board
+from game import Game
+from replay import (
+    RecordError,
+    _resulting_position,
+    _to_move,
+    format_game,
+    parse_turn,
+    replay_stream,
+)
+from types_ import Color
+
+
+def play_recorded_game(seed: int, max_turns: int = 1000) -> str:
+    rng = random.Random(seed)
+    game = Game(Board())
+    color = Color.LIGHT
+    turns = []
+
+    for _ in range(max_turns):
+        dice = rng.randint(1, 6), rng.randint(1, 6)
+        moves = game.find_moves(color, dice)
+        move = rng.choice(moves) if moves else ()
+        game.make_move(move)
+        turns.append((dice, move))
+
+        if game.winner is not None:
+            break
+        color = color.opposite
+
+    return format_game(turns)
+
+
+def test_replay_recorded_games():
+    records = io.StringIO(
+        "# recorded games\n\n"
+        + "\n".join(play_recorded_game(seed) for seed in range(3))
+    )
+    results = list(replay_stream(records))
+
+    assert [result.game_num for result in results] == [0, 1, 2]
+    assert all(result.error is None for result in results)
+    assert all(result.winner is not None for result in results)
+
+
+def test_replay_reordered_double():
+    def is_independent_double(turn: str) -> bool:
+        dice, steps = turn.split(":")
+        if dice[0] != dice[1] or not steps:
+            return False
+        sources = [int(step.split("/")[0]) for step in steps.split(",")]
+        targets = {source + int(dice[0]) for source in sources}
+        return len(set(sources)) > 1 and not targets & set(sources)
+
+    turns = play_recorded_game(0).split()
+    doubles = [
+        num for num, turn in enumerate(turns) if is_independent_double(turn)
+    ]
+    assert doubles
+
+    num = doubles[0]
+    dice, steps = turns[num].split(":")
+    turns[num] = f"{dice}:{','.join(reversed(steps.split(',')))}"
+    result = next(replay_stream([" ".join(turns)]))
+
+    assert result.error is None
+
+
+@pytest.mark.parametrize(
+    "line, expected_error",
+    [
+        pytest.param("65:0/6", "turn 1: illegal move 65:0/6", id="short move"),
+        pytest.param(
+            "65:0/6,0/5", "turn 1: illegal move 65:0/6,0/5", id="two head moves"
+        ),
+        pytest.param("65:0/6,6/5 7x:", "turn 2: malformed turn '7x:'", id="malformed"),
+        pytest.param(
+            "33:0/2,2/1,3/6", "turn 1: illegal move 33:0/2,2/1,3/6",
+            id="steps not from the roll",
+        ),
+        pytest.param("65:30/6", "turn 1: malformed turn '65:30/6'",
+                     id="position out of range"),
+        pytest.param("65:-1/6", "turn 1: malformed turn '65:-1/6'",
+                     id="negative position"),
+        pytest.param("65:0/7", "turn 1: malformed turn '65:0/7'",
+                     id="step out of range"),
+    ]
+)
+def test_replay_invalid_games(line: str, expected_error: str):
+    result = next(replay_stream([line]))
+    assert result.error.startswith(expected_error)
+
+
+def test_parse_turn():
+    assert parse_turn("31:0/3,3/1") == ((3, 1), ((0, 3), (3, 1)))
+    assert parse_turn("31:") == ((3, 1), ())
+
+    with pytest.raises(RecordError):
+        parse_turn("71:0/3")
+
+
+def test_to_move_rejects_positions_out_of_range():
+    assert _to_move(Color.DARK, ((23, 3),))[0][0].position == 23
+
+    with pytest.raises(RecordError):
+        _to_move(Color.DARK, ((-1, 3),))
+
+
+@pytest.mark.parametrize(
+    "position, step_len",
+    [
+        pytest.param(5, 4, id="empty cell"),
+        pytest.param(12, 4, id="opposite color"),
+    ]
+)
+def test_resulting_position_rejects_invalid_steps(position: int, step_len: int):
+    move = _to_move(Color.LIGHT, ((position, step_len),))
+    assert _resulting_position(Board(), move) is None
@@ -0,0 +1,117 @@
+from typing import Tuple
+
+import pytest
+
+from board import Board, Cell
+from game import Game
+from search import (
+    LOSS_VALUE,
+    ROLL_PROBABILITIES,
+    WIN_VALUE,
+    Searcher,
+    SearchTimeout,
+    race_evaluator,
+)
+from types_ import Color, Move
+
+
+def expectimax_value(board: Board, color: Color, depth: int) -> float:
+    if depth == 0:
+        return race_evaluator(board, color)
+
+    value = 0.0
+    for roll, probability in ROLL_PROBABILITIES:
+        moves = Game(board).find_moves(color, roll, unique=True)
+        if not moves:
+            value -= probability * expectimax_value(
+                board, color.opposite, depth - 1
+            )
+            continue
+
+        value += probability * max(
+            move_value(board, color, move, depth) for move in moves
+        )
+
+    return value
+
+
+def move_value(board: Board, color: Color, move: Move, depth: int) -> float:
+    for step in move:
+        board.apply_step(*step)
+    if board.occupancy_mask(color) == 0:
+        value = WIN_VALUE
+    else:
+        value = -expectimax_value(board, color.opposite, depth - 1)
+    for step in reversed(move):
+        board.undo_step(*step)
+    return value
+
+
+def race_board() -> Board:
+    return Board.from_dict({
+        8: Cell(n_pieces=1, color=Color.DARK),
+        10: Cell(n_pieces=2, color=Color.DARK),
+        17: Cell(n_pieces=1, color=Color.LIGHT),
+        21: Cell(n_pieces=1, color=Color.LIGHT),
+        23: Cell(n_pieces=1, color=Color.LIGHT),
+    })
+
+
+@pytest.mark.parametrize("depth", [1, 2, 3])
+@pytest.mark.parametrize("dice", [(5, 2), (3, 3)])
+def test_pruned_search_matches_expectimax(depth: int, dice: Tuple[int, int]):
+    board = race_board()
+    result = Searcher(max_depth=depth).choose_move(board, Color.LIGHT, dice)
+
+    expected_value = max(
+        move_value(board, Color.LIGHT, move, depth)
+        for move in Game(board).find_moves(Color.LIGHT, dice, unique=True)
+    )
+
+    assert result.depth == depth
+    assert result.value == pytest.approx(expected_value)
+    assert result.value == pytest.approx(
+        move_value(board, Color.LIGHT, result.move, depth)
+    )
+    assert board == race_board()
+
+
+def test_time_budget_returns_completed_depth():
+    board = Board()
+    result = Searcher(max_depth=10, time_budget=0.05).choose_move(
+        board, Color.LIGHT, (6, 5)
+    )
+
+    assert 1 <= result.depth < 10
+    assert result.move in Game(board).find_moves(Color.LIGHT, (6, 5))
+    assert board == Board()
+
+
+def test_timeout_before_first_depth(monkeypatch):
+    def time_out(*args):
+        raise SearchTimeout()
+
+    board = Board()
+    searcher = Searcher(max_depth=2, time_budget=0.05)
+    monkeypatch.setattr(searcher, "_search_root", time_out)
+    result = searcher.choose_move(board, Color.LIGHT, (6, 5))
+
+    assert result.depth == 0
+    assert result.move in Game(board).find_moves(Color.LIGHT, (6, 5))
+    assert LOSS_VALUE < result.value < WIN_VALUE
+    assert board == Board()
+
+
+def test_evaluator_bounds():
+    value = race_evaluator(race_board(), Color.DARK)
+    assert LOSS_VALUE < value < WIN_VALUE
+
+
+def test_no_moves():
+    board = Board.from_dict({
+        0: Cell(n_pieces=1, color=Color.LIGHT),
+        3: Cell(n_pieces=1, color=Color.DARK),
+        5: Cell(n_pieces=1, color=Color.DARK),
+    })
+    result = Searcher().choose_move(board, Color.LIGHT, (5, 3))
+    assert result.move is None
@@ -0,0 +1,27 @@
+import random
+
+from selfplay import play_game, run_selfplay
+
+
+def first_policy(game, color, dice, moves, rng: random.Random):
+    return moves[0]
+
+
+def test_play_game_is_reproducible():
+    assert play_game("seed", max_turns=40) == play_game("seed", max_turns=40)
+
+
+def test_policy_moves_are_applied():
+    result = play_game("seed", policy=first_policy, max_turns=1)
+    assert result.n_turns == 1
+    assert result.winner is None
+
+
+def test_results_do_not_depend_on_workers():
+    in_process = run_selfplay(6, seed=3, workers=1, chunk_size=4, max_turns=30)
+    in_pool = run_selfplay(6, seed=3, workers=2, chunk_size=1, max_turns=30)
+
+    assert in_process.results == in_pool.results
+    assert in_process.wins == in_pool.wins
+    assert sum(in_process.wins.values()) == 6
+
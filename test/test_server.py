@@ -0,0 +1,157 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from board import Board
+from game import Game
+import server
+from server import Client, GameServer, percentile, run_load
+from types_ import Color
+
+
+def run_with_server(scenario, **server_options):
+    async def run():
+        server = GameServer(ThreadPoolExecutor(2), **server_options)
+        async with server:
+            host, port = await server.start()
+            return await scenario(server, host, port)
+
+    return asyncio.run(run())
+
+
+def expected_moves(game: Game, color: Color, dice):
+    return [
+        [[piece.position, step_len] for piece, step_len in move]
+        for move in game.find_moves(color, dice)
+    ]
+
+
+def test_session_moves_and_play():
+    async def scenario(server, host, port):
+        client = await Client.connect(host, port)
+        session = (await client.request("new"))["session"]
+
+        moves = await client.request("moves", session=session, dice=[6, 5])
+        assert moves["moves"] == expected_moves(
+            Game(Board()), Color.LIGHT, (6, 5)
+        )
+
+        played = await client.request(
+            "play", session=session, dice=[6, 5], move=moves["moves"][0]
+        )
+        assert played == {"id": 2, "to_move": "DARK", "winner": None}
+
+        illegal = await client.request(
+            "play", session=session, dice=[1, 1], move=[[12, 6]]
+        )
+        assert illegal["error"].startswith("illegal move")
+
+        await client.request("close", session=session)
+        assert server.n_sessions == 0
+        await client.close()
+
+    run_with_server(scenario)
+
+
+def test_position_moves():
+    game = Game(Board())
+    game.make_move(game.find_moves(Color.LIGHT, (3, 1))[0])
+
+    async def scenario(server, host, port):
+        client = await Client.connect(host, port)
+        reply = await client.request(
+            "moves", position=game.to_bytes(Color.DARK).hex(), dice=[4, 2]
+        )
+        await client.close()
+        return reply
+
+    reply = run_with_server(scenario)
+    assert reply["moves"] == expected_moves(game, Color.DARK, (4, 2))
+
+
+@pytest.mark.parametrize(
+    "request_params, expected_error",
+    [
+        pytest.param({"op": "jump"}, "unknown op", id="op"),
+        pytest.param({"op": "moves", "session": 7, "dice": [1, 2]},
+                     "unknown session", id="session"),
+        pytest.param({"op": "moves", "position": "00", "dice": [1, 2]},
+                     "invalid position", id="position"),
+        pytest.param({"op": "moves", "position": "64" + "00" * 26,
+                      "dice": [1, 2]},
+                     "invalid position", id="cell out of range"),
+        pytest.param({"op": "moves", "position": "0f0f" + "00" * 22 + "000001",
+                      "dice": [1, 2]},
+                     "invalid position", id="too many pieces"),
+        pytest.param({"op": "moves", "position": "00", "dice": [0, 7]},
+                     "invalid dice", id="dice"),
+    ]
+)
+def test_invalid_requests(request_params, expected_error):
+    async def scenario(server, host, port):
+        client = await Client.connect(host, port)
+        op = request_params.pop("op")
+        reply = await client.request(op, **request_params)
+        await client.close()
+        return reply
+
+    assert run_with_server(scenario)["error"].startswith(expected_error)
+
+
+def test_concurrent_requests_are_batched():
+    async def scenario(server, host, port):
+        return await run_load(host, port, n_clients=8, n_turns=5)
+
+    server_options = {"max_batch": 8, "max_delay": 0.05}
+    report = run_with_server(scenario, **server_options)
+
+    assert len(report.latencies) == 8 * 5 * 2
+    assert report.p50 <= report.p99
+
+
+def test_batcher_coalesces_requests():
+    async def scenario(server, host, port):
+        clients = [await Client.connect(host, port) for _ in range(4)]
+        position = Game(Board()).to_bytes(Color.LIGHT).hex()
+        replies = await asyncio.gather(*(
+            client.request("moves", position=position, dice=[2, 1])
+            for client in clients
+        ))
+        for client in clients:
+            await client.close()
+        return replies, server.batcher.n_batches
+
+    replies, n_batches = run_with_server(scenario, max_delay=0.05)
+    assert len({str(reply["moves"]) for reply in replies}) == 1
+    assert n_batches == 1
+
+
+@pytest.mark.parametrize(
+    "values, q, expected",
+    [
+        pytest.param([], 50, 0.0, id="empty"),
+        pytest.param([3, 1, 2], 50, 2, id="median"),
+        pytest.param(list(range(1, 101)), 99, 99, id="p99"),
+    ]
+)
+def test_percentile(values, q, expected):
+    assert percentile(values, q) == expected
+
+
+def test_worker_errors_are_replied(monkeypatch):
+    def fail(requests):
+        raise RuntimeError("worker failed")
+
+    monkeypatch.setattr(server, "find_moves_chunk", fail)
+
+    async def scenario(game_server, host, port):
+        client = await Client.connect(host, port)
+        reply = await client.request(
+            "moves", position=Game(Board()).to_bytes(Color.LIGHT).hex(),
+            dice=[2, 1],
+        )
+        await client.close()
+        return reply
+
+    assert "worker failed" in run_with_server(scenario)["error"]